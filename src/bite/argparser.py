@@ -241,6 +241,9 @@ class override_attr(Action):
         else:
             target = self.target
 
+        # flag options without arguments set their constant value
+        if self.nargs == 0:
+            values = self.const
         setattr(target, self.attr, values)
 
 
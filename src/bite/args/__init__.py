@@ -104,6 +104,7 @@ class ServiceOpts(object, metaclass=_RegisterSubcmds):
     _config_map = {
         'skip_auth': str2bool,
         'verify': str2bool,
+        'bulk': str2bool,
         'quiet': str2bool,
         'columns': lambda x: setattr(const, 'COLUMNS', int(x)),
         'concurrent': int,
@@ -239,6 +240,21 @@ class Search(TemplatedSubcmd, ReceiveSubcmd):
         self.parser.add_argument(
             'terms', nargs='*', metavar='TERM', action='parse_stdin',
             help=f"string(s) to search for in {self.service.item.type} summary/title")
+        # optional args
+        self.opts.add_argument(
+            '--count', action='store_true',
+            help=f'output the number of matching {self.service.item.type}s')
+        self.opts.add_argument(
+            '--count-by', metavar='FIELD',
+            help='output the number of matches for each value of a search field',
+            docs=f"""
+                Output the number of matching {self.service.item.type}s for
+                each value of a given search field.
+
+                For example, using '--count-by status' with '--status NEW,ASSIGNED'
+                outputs the number of matches for each of the given statuses.
+                The count queries are run in parallel.
+            """)
 
 
 class PagedSearch(Search):
@@ -298,7 +314,7 @@ class Attachments(Subcmd):
     def description(self):
         return f"get attachments from {self.service.item.type}(s)"
 
-    def add_args(self, id_map=None, item_id=True):
+    def add_args(self, id_map=None, item_id=True, ids=True):
         super().add_args()
         # positional args
         if id_map:
@@ -306,7 +322,7 @@ class Attachments(Subcmd):
                 'ids', type=id_map, nargs='+', metavar='ID[:A_ID[,...]]', action='parse_stdin',
                 help=f"{self.service.item.type} ID(s) or {self.service.item.type} ID to attachment ID map(s)")
             self.parser.set_defaults(id_map=True)
-        else:
+        elif ids:
             self.parser.add_argument(
                 'ids', type='ids', nargs='+', metavar='ID', action='parse_stdin',
                 help=f"attachment ID(s) (or {self.service.item.type} ID(s) when --item-id is used)")
@@ -340,13 +356,14 @@ class Changes(ReceiveSubcmd):
     def description(self):
         return f"get changes from {self.service.item.type}(s)"
 
-    def add_args(self):
+    def add_args(self, ids=True):
         super().add_args()
         # positional args
-        self.parser.add_argument(
-            'ids', type='ids', nargs='+', metavar='ID', action='parse_stdin',
-            help=f"ID(s) or alias(es) of the {self.service.item.type}(s) "
-                 "to retrieve all changes")
+        if ids:
+            self.parser.add_argument(
+                'ids', type='ids', nargs='+', metavar='ID', action='parse_stdin',
+                help=f"ID(s) or alias(es) of the {self.service.item.type}(s) "
+                     "to retrieve all changes")
         # optional args
         self.opts.add_argument(
             '-n', '--number',
@@ -2,7 +2,7 @@ import argparse
 from functools import partial
 
 from .. import args
-from ..argparser import ParseStdin
+from ..argparser import ParseStdin, override_attr
 from ..objects import TimeInterval
 from ..utils import str2bool
 
@@ -21,6 +21,7 @@ class Bugzilla4_4Opts(args.ServiceOpts):
 
     _config_map = args.ServiceOpts._config_map.copy()
     _config_map['restrict_login'] = str2bool
+    _config_map['stream'] = str2bool
 
     def add_main_opts(self, service):
         """Add service specific arguments."""
@@ -28,6 +29,12 @@ class Bugzilla4_4Opts(args.ServiceOpts):
         auth_opts.add_argument(
             '--restrict', action='store_true', dest='restrict_login',
             help='restrict the login to your IP address')
+        # only JSON-RPC services support streaming
+        if hasattr(service, 'stream'):
+            self.service_opts.add_argument(
+                '--stream', nargs=0, const=True,
+                action=partial(override_attr, service, 'stream'),
+                help='incrementally parse search, changes, and comments results')
 
 
 class Bugzilla5_0Opts(Bugzilla4_4Opts):
@@ -7,6 +7,12 @@ class GithubRestOpts(args.ServiceOpts):
     _service = 'github-rest'
 
 
+class GithubGraphqlOpts(args.ServiceOpts):
+    """Github API v4"""
+
+    _service = 'github-graphql'
+
+
 class _BaseSearch(args.PagedSearch):
 
     def add_args(self, item=None):
@@ -121,3 +127,23 @@ class PRSearch(_BaseSearch, GithubRestOpts):
                 Note that this overrides generic search terms if both are
                 specified.
             """)
+
+
+class GraphqlSearch(_BaseSearch, GithubGraphqlOpts):
+    """Search for issues."""
+
+    def add_args(self):
+        super().add_args()
+        self.opts.add_argument(
+            '-C', '--no-comments', action='store_false', dest='get_comments',
+            help='do not request comments')
+        self.opts.add_argument(
+            '-H', '--no-history', action='store_false', dest='get_changes',
+            help='do not request issue history')
+
+
+class GraphqlGet(args.Get, GithubGraphqlOpts):
+    """Get issues."""
+
+    def add_args(self):
+        super().add_args(history=True)
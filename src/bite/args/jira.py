@@ -29,12 +29,26 @@ class JiraIDList(ArgType):
         return l
 
 
+class JiraItemIDs(ArgType):
+    """ID type for either attachment IDs or global Jira IDs."""
+
+    @staticmethod
+    def parse(s):
+        if s.isdigit():
+            return int(s)
+        return JiraIDs.parse(s)
+
+    def parse_stdin(self, data):
+        return [self.parse(x) for x in data]
+
+
 class JiraSubcmd(args.Subcmd):
 
     def __init__(self, *args, **kw):
         super().__init__(*args, **kw)
         self.parser.register('type', 'jira_ids', JiraIDs(self.service))
         self.parser.register('type', 'jira_id_list', JiraIDList(self.service))
+        self.parser.register('type', 'jira_item_ids', JiraItemIDs(self.service))
 
 
 class JiraOpts(args.ServiceOpts):
@@ -127,7 +141,7 @@ class Get(JiraSubcmd, args.Get, JiraOpts):
                 help=f"ID(s) of the {self.service.item.type}(s) to retrieve")
 
         add_ids = self.service.project is not None
-        super().add_args(ids=add_ids)
+        super().add_args(ids=add_ids, history=True)
 
 
 class Comments(JiraSubcmd, args.Comments, JiraOpts):
@@ -146,6 +160,39 @@ class Comments(JiraSubcmd, args.Comments, JiraOpts):
         super().add_args(ids=add_ids)
 
 
+class Changes(JiraSubcmd, args.Changes, JiraOpts):
+
+    def add_args(self):
+        # Force "project-ID" based item IDs for conglomerate jira connections
+        # that encompass all the projects available on the service.
+        if self.service.project is None:
+            # positional args
+            self.parser.add_argument(
+                'ids', type='jira_ids', nargs='+',
+                metavar='PROJECT-ID', action=partial(ParseStdin, 'jira_ids'),
+                help=f"ID(s) of the {self.service.item.type}(s) to retrieve all changes")
+
+        add_ids = self.service.project is not None
+        super().add_args(ids=add_ids)
+
+
+class Attachments(JiraSubcmd, args.Attachments, JiraOpts):
+
+    def add_args(self):
+        # Allow "project-ID" based item IDs for conglomerate jira connections
+        # that encompass all the projects available on the service.
+        if self.service.project is None:
+            # positional args
+            self.parser.add_argument(
+                'ids', type='jira_item_ids', nargs='+',
+                metavar='ID', action=partial(ParseStdin, 'jira_item_ids'),
+                help=f"attachment ID(s) (or PROJECT-ID {self.service.item.type} "
+                     "ID(s) when --item-id is used)")
+
+        add_ids = self.service.project is not None
+        super().add_args(ids=add_ids)
+
+
 class Version(args.Subcmd, JiraOpts):
     """get Jira version"""
 
@@ -61,6 +61,10 @@ class Comments(args.Comments, RoundupOpts):
     pass
 
 
+class Changes(args.Changes, RoundupOpts):
+    pass
+
+
 class Schema(args.Subcmd, RoundupOpts):
     """get Roundup db schema"""
 
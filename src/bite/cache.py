@@ -1,137 +1,258 @@
-import configparser
+import atexit
+from contextlib import closing
 from enum import Enum
 import gpg
 from http.cookiejar import LWPCookieJar
 from io import StringIO
+import json
+import logging
 import os
+import sqlite3
 import stat
+import tempfile
+import threading
+import time
+import weakref
 
 from . import const
 from .exceptions import BiteError
 
+logger = logging.getLogger(__name__)
 
-def csv2tuple(s):
-    return tuple(x.strip() for x in s.split(','))
 
+def _read_json(path):
+    """Load JSON data from a file, returning None if it's missing or unreadable."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        # ignore missing, corrupted or unreadable files, they'll be regenerated
+        return None
 
-def iter2csv(x):
-    return ', '.join(map(str, x))
 
-
-def ident(x):
-    return x
+def _write_json(path, data):
+    """Atomically write JSON data to a file, creating its directory as needed."""
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dirname)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
 
 
 class Cache(object):
-
-    def __init__(self, *, connection, defaults=None, converters=None):
-        self._settings = {}
-        if defaults is not None:
-            self._settings.update(defaults)
-
-        if converters is None:
-            converters = {}
-        self.converters = {}
-        self.converters['read'] = converters
-        self.converters['write'] = {
-            'tuple': iter2csv,
-            'str': ident,
-        }
+    """Per-connection store of service metadata.
+
+    Values are stored as JSON in an SQLite database along with the time they
+    were last updated and are only loaded when first accessed. Values older
+    than the cache's TTL, or missing ones, are refreshed by running the given
+    refresh function in a background thread while their current or default
+    values are returned. Running refreshes are waited on at exit for a limited
+    time, refreshes that fail or don't finish in time are recorded so they
+    aren't retried on every run.
+    """
+
+    # seconds until cached values are refreshed, None disables refreshing
+    ttl = None
+    # seconds until failed or interrupted refreshes are retried
+    retry = 60 * 60
+    # seconds to wait at exit for running refreshes to finish
+    exit_timeout = 10
+
+    # store key for the time of the last refresh attempt
+    _attempt_key = '_refresh_attempt'
+    # cache directories used by previous versions, relative to the cache path
+    _legacy_dirs = ('config',)
+
+    def __init__(self, *, connection, defaults=None, refresh=None):
+        self._defaults = dict(defaults) if defaults is not None else {}
+        # values loaded from the store
+        self._values = {}
+        self._refresh = refresh
+        self._refreshing = None
+        self._lock = threading.Lock()
 
         self.connection = connection
         if self.connection is not None:
-            self.path = os.path.join(const.USER_CACHE_PATH, 'config', self.connection)
-            self.read()
+            self.path = os.path.join(const.USER_CACHE_PATH, 'metadata', f'{self.connection}.db')
+            if not os.path.exists(self.path):
+                self._remove_legacy()
         else:
             self.path = None
 
-    def read(self, path=None):
-        """Load cached data from a config file."""
-        path = path if path is not None else self.path
-
-        if path is not None:
-            config = configparser.ConfigParser()
-            try:
-                with open(path, 'r') as f:
-                    config.read_file(f)
-                settings = config.items(self.connection)
-            except IOError:
-                settings = ()
-            self._settings.update(
-                (k, self.converters['read'].get(k, ident)(v))
-                for k, v in settings)
-
-    def write(self, path=None, updates=None):
-        """Write cache updates to a config file."""
-        path = path if path is not None else self.path
-
-        if path is not None:
-            d = updates if updates is not None else self._settings
-            d = {k: self.converters['write'].get(type(v).__name__, ident)(v)
-                for k, v in d.items()}
-
-            if self._settings:
-                os.makedirs(os.path.dirname(path), exist_ok=True)
-                config = configparser.ConfigParser()
-                config[self.connection] = d
-                with open(path, 'w') as f:
-                    config.write(f)
-
-    def remove(self, path=None):
-        """Remove cache file if it exists."""
-        path = path if path is not None else self.path
-
-        if path is not None:
+    def _remove_legacy(self):
+        """Remove cache files of previous versions, their values are regenerated."""
+        for d in self._legacy_dirs:
+            path = os.path.join(const.USER_CACHE_PATH, d, self.connection)
             try:
                 os.remove(path)
             except FileNotFoundError:
                 pass
             except IOError as e:
-                raise BiteError(f'unable to remove cache: {path!r}: {e.strerror}')
-
-    ## support dictionary access methods
+                logger.warning(f'unable to remove old cache: {path!r}: {e.strerror}')
+
+    def _connect(self):
+        """Open a connection to the store, creating its table if needed."""
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS metadata '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, updated REAL NOT NULL)')
+        return db
+
+    def _load(self, key):
+        """Pull a value and its last update time from the store."""
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        try:
+            with closing(self._connect()) as db:
+                row = db.execute(
+                    'SELECT value, updated FROM metadata WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            value, updated = row
+            value = json.loads(value)
+        except (sqlite3.Error, ValueError):
+            # ignore corrupted or unreadable values, they'll be regenerated
+            return None
+        return self._typed(value), updated
+
+    def _store(self, updates):
+        """Save values to the store, marking them as updated now."""
+        updated = time.time()
+        rows = tuple((k, json.dumps(v), updated) for k, v in updates.items())
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as db, db:
+            db.executemany('INSERT OR REPLACE INTO metadata VALUES (?, ?, ?)', rows)
+
+    @staticmethod
+    def _typed(value):
+        """Convert a value to the type it's loaded as."""
+        # JSON doesn't differentiate between lists and tuples
+        if isinstance(value, list):
+            return tuple(value)
+        return value
+
+    def _stale(self, updated):
+        """Determine if a value needs to be refreshed."""
+        if self.ttl is None or self._refresh is None or self.path is None:
+            return False
+        now = time.time()
+        if updated is not None and now - updated <= self.ttl:
+            return False
+        attempt = self._load(self._attempt_key)
+        return attempt is None or now - attempt[1] > self.retry
+
+    def refresh(self):
+        """Update cached values in a background thread, returning the thread.
+
+        The thread is waited on at exit for up to the exit timeout, failed or
+        interrupted refreshes are retried once the retry interval has passed.
+        """
+        with self._lock:
+            if self._refreshing is not None:
+                return self._refreshing
+            self._refreshing = threading.Thread(target=self._run_refresh, daemon=True)
+
+        _track_refresh(self)
+        self._refreshing.start()
+        return self._refreshing
+
+    def _run_refresh(self):
+        try:
+            self._refresh()
+        except Exception as e:
+            logger.warning(f'failed refreshing cache: {self.connection!r}: {e}')
+            self._record_attempt()
+
+    def _record_attempt(self):
+        """Record a failed or interrupted refresh attempt."""
+        if self.path is not None:
+            try:
+                self._store({self._attempt_key: None})
+            except (sqlite3.Error, IOError) as e:
+                logger.warning(f'failed writing cache: {self.path!r}: {e}')
 
-    def update(self, *args, **kwargs):
-        self._settings.update(*args, **kwargs)
+    def write(self, updates):
+        """Store updated values, marking them as updated now."""
+        with self._lock:
+            self._values.update((k, self._typed(v)) for k, v in updates.items())
 
-    def __setitem__(self, key, item):
-        self._settings[key] = item
+        if self.path is None or not updates:
+            return
+        try:
+            self._store(updates)
+        except (sqlite3.Error, IOError) as e:
+            raise BiteError(f'failed writing cache: {self.path!r}: {e}')
 
-    def __getitem__(self, key):
-        return self._settings[key]
+    def remove(self):
+        """Remove cache file if it exists."""
+        with self._lock:
+            self._values.clear()
 
-    def __repr__(self):
-        return repr(self._settings)
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except IOError as e:
+                raise BiteError(f'unable to remove cache: {self.path!r}: {e.strerror}')
 
-    def __len__(self):
-        return len(self._settings)
+    def __getitem__(self, key):
+        with self._lock:
+            try:
+                return self._values[key]
+            except KeyError:
+                pass
 
-    def __delitem__(self, key):
-        del self._settings[key]
+            row = self._load(key)
+            if row is None:
+                value, updated = self._defaults[key], None
+            else:
+                value, updated = row
+            self._values[key] = value
 
-    def __eq__(self, x):
-        return x == self._settings
+        if self._stale(updated):
+            self.refresh()
+        return value
 
-    def clear(self):
-        return self._settings.clear()
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
 
-    def copy(self):
-        return self._settings.copy()
 
-    def has_key(self, k):
-        return k in self._settings
+# caches that have started refreshing, their refreshes are waited on at exit
+_refreshes = set()
+_refreshes_lock = threading.Lock()
 
-    def get(self, key):
-        return self._settings.get(key)
 
-    def keys(self):
-        return self._settings.keys()
+def _track_refresh(cache):
+    with _refreshes_lock:
+        if not _refreshes:
+            # Register on the first refresh so it runs before exit handlers
+            # registered on import, e.g. the request scheduler's cancellation
+            # that would fail refreshes waiting on requests.
+            atexit.register(_finish_refreshes)
+        _refreshes.add(cache)
 
-    def values(self):
-        return self._settings.values()
 
-    def items(self):
-        return self._settings.items()
+def _finish_refreshes():
+    """Wait for running cache refreshes, recording those that don't finish in time."""
+    with _refreshes_lock:
+        caches = tuple(_refreshes)
+    start = time.monotonic()
+    for cache in caches:
+        cache._refreshing.join(max(start + cache.exit_timeout - time.monotonic(), 0))
+        if cache._refreshing.is_alive():
+            cache._record_attempt()
 
 
 class Auth(object):
@@ -288,3 +409,261 @@ class Cookies(LWPCookieJar):
                 pass
             except IOError as e:
                 raise BiteError(f'failed loading cookies: {filename!r}: {e}')
+
+
+class RateLimit(object):
+    """Track a service's rate limit budget, pacing requests so it lasts until reset.
+
+    Budgets are pulled from the X-RateLimit-* or RateLimit-* headers of
+    responses and tracked per rate limit resource (e.g. separate core and
+    search limits). Interactive requests are only delayed once a budget is
+    exhausted while bulk requests are spread out over the remaining window,
+    leaving a reserve for interactive use. Budgets are tracked in memory and
+    saved per connection at exit or once they're nearly exhausted so
+    concurrent and subsequent runs share them.
+    """
+
+    # fraction of each budget reserved for interactive requests
+    _reserve = 0.1
+
+    def __init__(self, connection, bulk=False):
+        self.bulk = bulk
+        # rate limit resource -> [limit, remaining, reset]
+        self._budgets = {}
+        # request route -> rate limit resource
+        self._routes = {}
+        # earliest time the next bulk request can be sent per resource
+        self._next = {}
+        self._lock = threading.Lock()
+        # budgets changed since they were last saved
+        self._changed = False
+        # (resource, reset) windows already saved as nearly exhausted
+        self._saved = set()
+
+        if connection is not None:
+            self.path = os.path.join(const.USER_CACHE_PATH, 'ratelimit', connection)
+            self.read()
+            _exit_writes.add(self)
+        else:
+            self.path = None
+
+    def _merge_saved(self, data):
+        """Merge budgets saved by other runs."""
+        self._routes.update(data.get('routes', {}))
+        for resource, budget in data.get('budgets', {}).items():
+            self._merge(resource, *budget)
+
+    def read(self):
+        """Merge saved budgets."""
+        if self.path is None:
+            return
+        data = _read_json(self.path)
+        if data is not None:
+            with self._lock:
+                self._merge_saved(data)
+
+    def write(self):
+        """Atomically save the current budgets if they've changed.
+
+        Budgets saved by other runs are merged before writing.
+        """
+        if self.path is None or not self._changed:
+            return
+        saved = _read_json(self.path)
+        with self._lock:
+            if saved is not None:
+                self._merge_saved(saved)
+            data = {
+                'budgets': {k: list(v) for k, v in self._budgets.items()},
+                'routes': dict(self._routes),
+            }
+            self._changed = False
+        try:
+            _write_json(self.path, data)
+        except IOError as e:
+            # budgets are only advisory, don't fail requests over them
+            logger.warning(f'failed writing rate limit cache: {self.path!r}: {e.strerror}')
+
+    def _merge(self, resource, limit, remaining, reset):
+        """Update a budget, preferring newer windows and lower remaining counts."""
+        current = self._budgets.get(resource)
+        if current is not None:
+            _limit, cur_remaining, cur_reset = current
+            if reset < cur_reset or (reset == cur_reset and remaining >= cur_remaining):
+                return False
+        self._budgets[resource] = [limit, remaining, reset]
+        return True
+
+    @staticmethod
+    def _header(headers, name):
+        """Pull an integer value from the prefixed or unprefixed rate limit header."""
+        for key in (f'X-RateLimit-{name}', f'RateLimit-{name}'):
+            value = headers.get(key)
+            if value is not None:
+                try:
+                    return int(float(value))
+                except ValueError:
+                    return None
+        return None
+
+    def update(self, route, headers):
+        """Update the budget for a route from response headers.
+
+        Returns True if the budget for the route is exhausted.
+        """
+        now = time.time()
+        remaining = self._header(headers, 'Remaining')
+        limit = self._header(headers, 'Limit')
+        reset = self._header(headers, 'Reset')
+        resource = headers.get('X-RateLimit-Resource', 'default')
+
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                reset = now + int(retry_after)
+                remaining = 0
+            except ValueError:
+                pass
+
+        if remaining is None or reset is None:
+            return False
+        if reset < 1000000000:
+            # relative reset times are in seconds
+            reset = now + reset
+        if limit is None:
+            limit = remaining
+
+        with self._lock:
+            if self._routes.get(route) != resource:
+                self._routes[route] = resource
+                self._changed = True
+            if self._merge(resource, limit, remaining, reset):
+                self._changed = True
+            limit, remaining, reset = self._budgets[resource]
+            save = remaining <= limit * self._reserve and (resource, reset) not in self._saved
+            if save:
+                self._saved.add((resource, reset))
+
+        if save:
+            # let concurrent runs start pacing their requests
+            self.write()
+        return remaining <= 0
+
+    def acquire(self, route):
+        """Wait until a request for the given route can be sent."""
+        with self._lock:
+            resource = self._routes.get(route, 'default')
+            budget = self._budgets.get(resource)
+            now = time.time()
+            if budget is None or budget[2] <= now:
+                # unknown or expired budget
+                return
+            limit, remaining, reset = budget
+
+            reserve = int(limit * self._reserve) if self.bulk else 0
+            available = remaining - reserve
+            if available <= 0:
+                wait = reset - now
+            elif self.bulk:
+                # spread the available budget evenly over the remaining window
+                start = max(now, self._next.get(resource, now))
+                self._next[resource] = start + (reset - now) / available
+                wait = start - now
+            else:
+                wait = 0
+
+            # assume the request counts against the budget until told otherwise
+            budget[1] -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Index(object):
+    """Persistent mapping of service data that never changes, e.g. ID aliases.
+
+    Mappings are only ever added, so they're collected in memory and merged
+    with any saved by other runs before being written per connection at exit.
+    """
+
+    def __init__(self, connection, name):
+        self._index = {}
+        self._lock = threading.Lock()
+        # mappings added since they were last saved
+        self._changed = False
+
+        if connection is not None:
+            self.path = os.path.join(const.USER_CACHE_PATH, 'index', name, connection)
+            self.read()
+            _exit_writes.add(self)
+        else:
+            self.path = None
+
+    def read(self):
+        """Merge saved mappings."""
+        if self.path is None:
+            return
+        data = _read_json(self.path)
+        if data is not None:
+            with self._lock:
+                self._index.update(data)
+
+    def write(self):
+        """Atomically save the current mappings if any were added.
+
+        Mappings saved by other runs are merged before writing.
+        """
+        if self.path is None or not self._changed:
+            return
+        saved = _read_json(self.path)
+        with self._lock:
+            if saved is not None:
+                saved.update(self._index)
+                self._index = saved
+            data = dict(self._index)
+            self._changed = False
+        try:
+            _write_json(self.path, data)
+        except IOError as e:
+            # mappings are regenerated when missing, don't fail requests over them
+            logger.warning(f'failed writing index: {self.path!r}: {e.strerror}')
+
+    def update(self, mappings):
+        """Add mappings, they're saved at exit."""
+        mappings = {str(k): v for k, v in mappings}
+        with self._lock:
+            if mappings.items() <= self._index.items():
+                return
+            self._index.update(mappings)
+            self._changed = True
+
+    def lookup(self, keys):
+        """Return the values for all given keys or None if any are missing."""
+        try:
+            return [self._index[str(k)] for k in keys]
+        except KeyError:
+            return None
+
+    def __getitem__(self, key):
+        return self._index[str(key)]
+
+    def get(self, key, default=None):
+        return self._index.get(str(key), default)
+
+    def __contains__(self, key):
+        return str(key) in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+
+# rate limits and indexes of all connections, their data is saved at exit
+_exit_writes = weakref.WeakSet()
+
+
+def _write_all():
+    for store in tuple(_exit_writes):
+        store.write()
+
+
+atexit.register(_write_all)
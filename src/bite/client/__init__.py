@@ -340,13 +340,29 @@ class Cli(Client):
 
     @dry_run
     @login_retry
-    def search(self, **kw):
+    def search(self, count=False, count_by=None, **kw):
         """Search for items on the service."""
-        request = self.service.SearchRequest(params=kw)
+        request = self.service.SearchRequest(params=dict(kw))
 
         self.log(f'Searching for {self.service.item.type}s with the following options:')
         self.log_t(request.options, prefix='   - ')
 
+        if count_by is not None:
+            count_by = count_by.replace('-', '_')
+            values = kw.get(count_by)
+            if not isinstance(values, (list, tuple)):
+                raise BiteError(f'no {count_by!r} search values specified to count by')
+            reqs = [
+                self.service.SearchRequest(params=dict(kw, **{count_by: [x]}))
+                for x in values]
+            for value, count in zip(values, self._count(reqs)):
+                print(f'{value}: {count}')
+            return
+        elif count:
+            for count in self._count([request]):
+                print(count)
+            return
+
         data = request.send()
 
         lines = self._render_search(data, **kw)
@@ -356,6 +372,15 @@ class Cli(Client):
             print(line[:const.COLUMNS])
         self.log(f"{count} {self.service.item.type}{pluralism(count)} found.")
 
+    def _count(self, reqs):
+        """Get the number of results for the given search requests."""
+        count_reqs = [getattr(r, 'count_request', lambda: None)() for r in reqs]
+        if all(x is not None for x in count_reqs):
+            # run count-only queries in parallel
+            return self.service.send(count_reqs)
+        # fallback to counting streamed results
+        return (sum(1 for _ in r.send()) for r in reqs)
+
     def _header(self, char, msg):
         return f'{char * 3} {msg} {char * (const.COLUMNS - len(msg) - 5)}'
 
@@ -412,9 +437,7 @@ class Cli(Client):
 
     def cache(self, *args, update=False, remove=False, **kw):
         if update:
-            updates = self.service.cache_updates
-            if updates != self.service.cache:
-                self.service.cache.write(updates=updates)
+            self.service.cache.write(updates=self.service.cache_updates)
         elif remove:
             self.service.cache.remove()
 
@@ -136,13 +136,20 @@ class Magic:
             magic_close(self.cookie)
             self.cookie = None
 
-_instances = {}
+# Amount of leading data used to identify buffers, libmagic only checks the
+# start of files for the vast majority of its tests anyway.
+SNIFF_SIZE = 64 * 1024
+
+# separate libmagic handles per thread so lookups don't serialize on their locks
+_instances = threading.local()
 
 
 def _get_magic_type(mime):
-    i = _instances.get(mime)
+    key = 'mime' if mime else 'text'
+    i = getattr(_instances, key, None)
     if i is None:
-        i = _instances[mime] = Magic(mime=mime)
+        i = Magic(mime=mime)
+        setattr(_instances, key, i)
     return i
 
 
@@ -163,13 +170,13 @@ def from_buffer(buffer, mime=False):
     """
     Accepts a binary string and returns the detected filetype.  Return
     value is the mimetype if mime=True, otherwise a human readable
-    name.
+    name. Only the first SNIFF_SIZE bytes of the buffer are examined.
 
     >>> magic.from_buffer(open("testdata/test.pdf").read(1024))
     'PDF document, version 1.2'
     """
     m = _get_magic_type(mime)
-    return m.from_buffer(buffer)
+    return m.from_buffer(buffer[:SNIFF_SIZE])
 
 
 libmagic = None
@@ -1,10 +1,12 @@
 from itertools import chain
 import bz2
 from datetime import datetime
+import gzip
 import lzma
 import os
 import re
 import stat
+import sys
 import zlib
 
 try:
@@ -13,6 +15,7 @@ try:
 except ImportError:
     import chardet
 from snakeoil import klass
+from snakeoil.mappings import ImmutableDict
 from snakeoil.osutils import sizeof_fmt
 
 from . import magic, const
@@ -20,11 +23,31 @@ from .exceptions import BiteError
 from .utc import utc, parse_date
 
 
+# compression format signatures mapped to their one-shot decompression
+# functions and incremental decompressor object types
+_decompressors = (
+    (b'BZh', bz2.decompress, bz2.BZ2Decompressor),
+    (b'\x1f\x8b', gzip.decompress, lambda: zlib.decompressobj(16 + zlib.MAX_WBITS)),
+    (b'\xfd7zXZ\x00', lzma.decompress, lzma.LZMADecompressor),
+)
+
+# errors raised when decompressing corrupted or misidentified data
+_decompress_errors = (OSError, EOFError, lzma.LZMAError, zlib.error)
+
+
+def _decompressor(data, incremental=False):
+    """Return a decompressor for the given data if it's in a supported compression format."""
+    for signature, oneshot, decompressor in _decompressors:
+        if data.startswith(signature):
+            return decompressor() if incremental else oneshot
+    return None
+
+
 def decompress(fcn):
     """Decorator that decompresses returned data.
 
-    libmagic is used to identify the MIME type of the data and the function
-    will keep decompressing until no supported compression format is identified.
+    Compression formats are identified by their leading magic bytes and the
+    function will keep decompressing until no supported format is identified.
     """
     def wrapper(cls, raw=False, *args, **kw):
         data = fcn(cls)
@@ -33,19 +56,42 @@ def decompress(fcn):
             # return raw data without decompressing
             return data
 
-        mime_type, mime_subtype = magic.from_buffer(data, mime=True).split('/')
-        while mime_subtype in ('x-bzip2', 'x-bzip', 'bzip', 'x-gzip', 'gzip', 'x-xz'):
-            if mime_subtype in ('x-bzip2', 'x-bzip', 'bzip'):
-                data = bz2.decompress(data)
-            elif mime_subtype in ('x-gzip', 'gzip'):
-                data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
-            elif mime_subtype in ('x-xz'):
-                data = lzma.decompress(data)
-            mime_type, mime_subtype = magic.from_buffer(data, mime=True).split('/')
+        decompressor = _decompressor(data)
+        while decompressor is not None:
+            try:
+                data = decompressor(data)
+            except _decompress_errors:
+                # data only looks compressed, return it as is
+                break
+            decompressor = _decompressor(data)
         return data
     return wrapper
 
 
+def peek(data, size=magic.SNIFF_SIZE):
+    """Return the leading, decompressed chunk of data used to identify its file type.
+
+    Only as much data as needed is decompressed, avoiding decompressing entire
+    files in order to determine their MIME types.
+    """
+    if _decompressor(data) is None:
+        return data[:size]
+
+    # nested formats may need more than the requested size of the outer
+    # layer, keep decompressing larger chunks until enough is peeked
+    length = size
+    while True:
+        try:
+            chunk = _decompressor(data, incremental=True).decompress(data, length)
+        except _decompress_errors:
+            # leave corrupted data for libmagic to identify
+            return data[:size]
+        inner = peek(chunk, size)
+        if len(inner) >= size or len(chunk) < length:
+            return inner
+        length *= 2
+
+
 class DateTime(object):
     """Object that converts/stores a given datetime object."""
 
@@ -207,12 +253,20 @@ class IntRange(object):
 
 
 class Item(object):
-    """Generic bug/issue/ticket object used by a service."""
+    """Generic bug/issue/ticket object used by a service.
+
+    Services can store the raw response mapping for an item in the `_data`
+    attribute, its fields are then converted to attributes on first access
+    using the `_converters` schema and cached.
+    """
 
     attributes = {}
     attribute_aliases = {}
     type = None
 
+    # map of raw field names to functions converting them to attribute values
+    _converters = {}
+
     _print_fields = (
         ('title', 'Title'),
         ('id', 'ID'),
@@ -277,7 +331,21 @@ class Item(object):
         lines.extend(sorted(self._custom_str_fields()))
         return '\n'.join(lines)
 
+    def _decode_field(self, name, value):
+        """Convert a raw field value into its related attribute value."""
+        convert = self._converters.get(name)
+        if convert is not None:
+            return convert(value)
+        return value
+
     def __getattr__(self, name):
+        # lazily decode raw fields, caching the converted value
+        data = self.__dict__.get('_data')
+        if data is not None and name in data:
+            value = self._decode_field(name, data[name])
+            self.__dict__[name] = value
+            return value
+
         if name in self.attributes:
             return None
         elif name in self.attribute_aliases:
@@ -287,22 +355,41 @@ class Item(object):
 
     # allow items to be used as mapping args to functions
     def __getitem__(self, key):
-        return self.__dict__[key]
+        if key in self.__dict__ or key in self.__dict__.get('_data', ()):
+            return getattr(self, key)
+        raise KeyError(key)
 
     def keys(self):
-        return self.__dict__.keys()
+        keys = self.__dict__.keys() | self.__dict__.get('_data', {}).keys()
+        keys.discard('_data')
+        return keys
+
+
+# shared mapping for events without any field changes
+_NO_CHANGES = ImmutableDict()
+
+
+def field_change(field, removed, added):
+    """Return an interned field name and its (removed, added) pair.
+
+    Change keys are repeated across every event pulled for an item so interning
+    them avoids storing thousands of copies of the same few strings.
+    """
+    return sys.intern(field), (removed, added)
 
 
 class Change(object):
     """Generic change event on a service."""
 
+    __slots__ = ('id', 'creator', 'created', 'changes', 'count')
+
     change_aliases = {}
 
     def __init__(self, creator, created, changes, id=None, count=None):
         self.id = id # int
         self.creator = creator # string
         self.created = created # date object
-        self.changes = changes # dict
+        self.changes = changes if changes else _NO_CHANGES # dict
         self.count = count # id
 
     def __str__(self):
@@ -351,6 +438,8 @@ class Change(object):
 class Comment(Change):
     """Generic comment on a service."""
 
+    __slots__ = ('modified', 'text')
+
     def __init__(self, creator, created, modified=None,
                  id=None, count=None, changes=None, text=None):
         self.modified = modified
@@ -396,7 +485,7 @@ class Attachment(object):
 
         # don't trust the content type -- users often set the wrong mimetypes
         if self.data is not None:
-            mimetype = magic.from_buffer(self.read(), mime=True)
+            mimetype = magic.from_buffer(peek(self.read(raw=True)), mime=True)
             if mimetype == 'application/octet-stream':
                 # assume these are plaintext
                 self.mimetype = 'text/plain'
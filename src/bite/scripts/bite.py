@@ -5,7 +5,7 @@ trackers in different manners.
 """
 
 import argparse
-import concurrent.futures
+from copy import copy
 from functools import partial
 import os
 
@@ -15,6 +15,7 @@ from ..alias import Aliases
 from ..client import Cli
 from ..config import Config
 from ..exceptions import RequestError
+from ..service._scheduler import scheduler
 
 from .. import const
 
@@ -61,6 +62,18 @@ connect_opts.add_argument(
 connect_opts.add_argument(
     '--timeout', type=float, metavar='SECONDS',
     help='amount of time to wait before timing out requests (defaults to 30 seconds)')
+connect_opts.add_argument(
+    '--bulk', action='store_true', default=None,
+    help='pace requests as a low priority bulk job',
+    docs="""
+        Spread requests evenly over the rate limit window advertised by the
+        service, leaving part of the budget free for interactive use.
+
+        By default, requests are only delayed when a service's rate limit is
+        exhausted. Rate limit budgets are tracked via the X-RateLimit-* or
+        RateLimit-* response headers and are shared between concurrent runs
+        using the same connection.
+    """)
 
 auth_opts = argparser.add_argument_group('Authentication options')
 single_auth_opts = auth_opts.add_mutually_exclusive_group()
@@ -184,6 +197,8 @@ def _cache(options, out, err):
         base = config.get(connection, 'base', fallback=None)
         if service is None or base is None:
             return 1
+        # updates run concurrently, don't share their options
+        options = copy(options)
         options.connection = connection
         options.base = base
         args = vars(options)
@@ -196,15 +211,15 @@ def _cache(options, out, err):
             return 1
         return 0
 
-    # run all cache updates in parallel
+    # run cache updates in parallel on the shared request scheduler, its
+    # workers run the update requests inline when they can't be started
     if len(connections) > 1:
         options.quiet = True
     options.skip_auth = True
-    ret = []
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(connections)) as executor:
-        future_to_c = {executor.submit(_cache_update, options, c): c for c in connections}
-        for future in concurrent.futures.as_completed(future_to_c):
-            ret.append(future.result())
+    futures = [
+        scheduler.submit(f'cache:{c}', 1, _cache_update, options, c)
+        for c in connections]
+    ret = [x.result() for x in futures]
     return int(any(ret))
 
 
@@ -1,7 +1,8 @@
 import atexit
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future
 from functools import partial
-from multiprocessing import cpu_count
+import threading
 from urllib.parse import urlparse, urlunparse
 import warnings
 import urllib3
@@ -10,15 +11,16 @@ import requests
 from snakeoil.sequences import iflatten_instance
 
 from ._reqs import Request, ExtractData
+from ._scheduler import HostExecutor, scheduler
 from .. import __title__, __version__
-from ..cache import Cache, Auth, Cookies
+from ..cache import Cache, Auth, Cookies, RateLimit
 from ..exceptions import RequestError, AuthError, BiteError
 from ..objects import Item, Attachment
 
 
 class Session(requests.Session):
 
-    def __init__(self, concurrent=None, verify=True, stream=True,
+    def __init__(self, executor=None, verify=True, stream=True,
                  timeout=None, allow_redirects=False):
         super().__init__()
         self.verify = verify
@@ -31,8 +33,12 @@ class Session(requests.Session):
             # default to timing out connections after 30 seconds
             self.timeout = timeout if timeout is not None else 30
 
-        # block when urllib3 connection pool is full
-        concurrent = concurrent if concurrent is not None else cpu_count() * 5
+        # block when urllib3 connection pool is full, sized to match the
+        # number of requests allowed in flight to the host
+        if executor is not None:
+            concurrent = executor.max_workers
+        else:
+            concurrent = HostExecutor.default_max_workers
         a = requests.adapters.HTTPAdapter(pool_maxsize=concurrent, pool_block=True)
         self.mount('https://', a)
         self.mount('http://', a)
@@ -100,6 +106,8 @@ class Service(object):
     _service = None
     _service_error_cls = RequestError
     _cache_cls = Cache
+    # number of times to retry rate limited requests
+    _ratelimit_retries = 1
 
     item = Item
     item_endpoint = None
@@ -108,7 +116,7 @@ class Service(object):
 
     def __init__(self, *, base, endpoint='', connection=None, verify=True, user=None, password=None,
                  auth_file=None, auth_token=None, suffix=None, timeout=None, concurrent=None,
-                 max_results=None, debug=None, verbosity=0, **kw):
+                 max_results=None, bulk=False, debug=None, verbosity=0, **kw):
         self.base = base
         self.webbase = base
         self.connection = connection
@@ -121,8 +129,9 @@ class Service(object):
 
         self.client = ClientCallbacks()
 
-        # max workers defaults to system CPU count * 5 if concurrent is None
-        self.executor = ThreadPoolExecutor(max_workers=concurrent)
+        # requests are run by the process-wide scheduler, limiting the number
+        # in flight to the service's host
+        self.executor = scheduler.executor(urlparse(self.base).netloc, max_workers=concurrent)
 
         url = urlparse(self.base)
         self._base = urlunparse((
@@ -132,11 +141,12 @@ class Service(object):
             None, None, None))
 
         self.authenticated = False
-        self.cache = self._cache_cls(connection=connection)
+        self.cache = self._cache_cls(connection=connection, refresh=self._refresh_cache)
         self.auth = Auth(connection, path=auth_file, token=auth_token)
+        # pace requests according to the service's rate limit headers
+        self.ratelimit = RateLimit(connection, bulk=bulk)
 
-        concurrent = self.executor._max_workers
-        self.session = Session(concurrent=concurrent, verify=verify, timeout=timeout)
+        self.session = Session(executor=self.executor, verify=verify, timeout=timeout)
         self._web_session = None
 
         # login if user/pass was specified and the auth token isn't set
@@ -148,6 +158,14 @@ class Service(object):
         """Pull latest data from service for cache update."""
         return {}
 
+    def _refresh_cache(self):
+        """Update cached service data."""
+        self.cache.write(updates=self.cache_updates)
+
+    def batch(self, reqs):
+        """Combine requests for sending, merging them into a single request if supported."""
+        return Request(service=self, reqs=reqs)
+
     def login(self, *, user, password, **kw):
         """Authenticate a session."""
         try:
@@ -243,7 +261,7 @@ class Service(object):
             self.service = service
             self.authenticate = login
             self.authenticated = False
-            self.session = Session()
+            self.session = Session(executor=service.executor)
             self.session.cookies = Cookies(self.service.connection)
             self.session.cookies.load()
             self.params = {}
@@ -303,12 +321,56 @@ class Service(object):
         def __exit__(self, *args):
             pass
 
-    def send(self, *reqs, **kw):
-        """Send requests and return parsed response data."""
-        # TODO: simplify this using async/await
-        if not reqs:
-            return None
+    @staticmethod
+    def _schedule(deps, func, *args):
+        """Run a function once its dependency futures are done.
 
+        Returns a future for the function's result. The function is run by
+        the thread completing the last dependency so no worker threads are
+        tied up waiting. Returned futures are chained, resolving to their
+        eventual results.
+        """
+        result = Future()
+        remaining = [len(deps)]
+        lock = threading.Lock()
+
+        def chain(future):
+            try:
+                result.set_result(future.result())
+            except BaseException as e:
+                result.set_exception(e)
+
+        def run():
+            try:
+                value = func(*args)
+            except BaseException as e:
+                result.set_exception(e)
+                return
+            if isinstance(value, Future):
+                value.add_done_callback(chain)
+            else:
+                result.set_result(value)
+
+        def done(_future):
+            with lock:
+                remaining[0] -= 1
+                ready = not remaining[0]
+            if ready:
+                run()
+
+        if not deps:
+            run()
+        for x in deps:
+            x.add_done_callback(done)
+        return result
+
+    def submit(self, *reqs, **kw):
+        """Send requests without waiting, returning futures for their parsed data.
+
+        Requests are resolved as a dependency graph: parsing is scheduled
+        once the related HTTP requests or subrequests complete and follow-up
+        requests are sent as soon as the results they depend on are parsed.
+        """
         ident = lambda x: x
 
         def _parse(parse, iterate, reqs, generator=False):
@@ -317,7 +379,14 @@ class Service(object):
                 results = next(results)
             return parse(results)
 
-        def _send_jobs(reqs):
+        def _followup(req, job, **kw):
+            """Send the follow-up requests for a request once it's parsed."""
+            items = tuple(job.result())
+            followups = _send_jobs(tuple(req.followups(items)), **dict(kw, **req._followup_kw))
+            return self._schedule(
+                followups, lambda: req.combine(items, tuple(x.result() for x in followups)))
+
+        def _send_jobs(reqs, **kw):
             jobs = []
             for req in iflatten_instance(reqs, Request):
                 parse = getattr(req, 'parse', ident)
@@ -325,18 +394,16 @@ class Service(object):
                 req_parse = getattr(req, 'parse_response', None)
                 raw = getattr(req, '_raw', None)
                 generator = bool(getattr(req, '_reqs', ()))
+                job = None
 
                 if isinstance(req, Request) and generator:
                     # force subreqs to be sent and parsed in parallel
-                    data = _send_jobs(iter(req))
-                    jobs.append(self.executor.submit(
-                        _parse, parse, iterate, data, generator))
+                    data = _send_jobs(iter(req), **kw)
+                    job = self._schedule(data, _parse, parse, iterate, data, generator)
                 else:
                     http_reqs = []
-                    if not hasattr(req, '__iter__'):
-                        req = [req]
-
-                    for r in iflatten_instance(req, requests.Request):
+                    subreqs = req if hasattr(req, '__iter__') else [req]
+                    for r in iflatten_instance(subreqs, requests.Request):
                         if isinstance(r, requests.Request):
                             func = partial(
                                 self._http_send, raw=raw, req_parse=req_parse, **kw)
@@ -345,11 +412,23 @@ class Service(object):
                         http_reqs.append(self.executor.submit(func, r))
 
                     if http_reqs:
-                        jobs.append(self.executor.submit(
-                            _parse, parse, iterate, http_reqs, generator))
+                        job = self._schedule(
+                            http_reqs, _parse, parse, iterate, http_reqs, generator)
+
+                if job is not None:
+                    if hasattr(req, 'followups'):
+                        job = self._schedule([job], partial(_followup, req, job, **kw))
+                    jobs.append(job)
             return jobs
 
-        data = (x.result() for x in _send_jobs(reqs))
+        return _send_jobs(reqs, **kw)
+
+    def send(self, *reqs, **kw):
+        """Send requests and return parsed response data."""
+        if not reqs:
+            return None
+
+        data = (x.result() for x in self.submit(*reqs, **kw))
 
         generator = isinstance(reqs[0], (list, tuple))
         if len(reqs) == 1 and not generator:
@@ -357,9 +436,50 @@ class Service(object):
         else:
             return data
 
+    def pipeline(self, ids, request, size=100):
+        """Request item data in chunks as their IDs become known.
+
+        Chunks of up to the given size are sent concurrently as soon as they
+        fill, with the request function creating the request for a list of
+        IDs. Items are yielded in ID order and completed chunks are returned
+        while further IDs are still being retrieved.
+        """
+        pending = deque()
+        chunk = []
+
+        for i in ids:
+            chunk.append(i)
+            if len(chunk) >= size:
+                pending.extend(self.submit(request(chunk)))
+                chunk = []
+                # return leading chunks that are already done
+                while pending and pending[0].done():
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.extend(self.submit(request(chunk)))
+
+        while pending:
+            yield from pending.popleft().result()
+
+    def _ratelimit_route(self, url):
+        """Determine the rate limit route for a request URL."""
+        path = urlparse(url).path
+        base = urlparse(self._base).path
+        if path.startswith(base):
+            path = path[len(base):]
+        return path.strip('/').split('/', 1)[0]
+
     def _http_send(self, req, raw=None, req_parse=None, **kw):
         """Send an HTTP request and return the parsed response."""
-        response = self.session.send(req, **kw)
+        route = self._ratelimit_route(req.url)
+        for _ in range(self._ratelimit_retries + 1):
+            self.ratelimit.acquire(route)
+            response = self.session.send(req, **kw)
+            exhausted = self.ratelimit.update(route, response.headers)
+            # retry requests rejected due to rate limiting after the limit resets
+            if not (exhausted and response.status_code in (403, 429)):
+                break
+            response.close()
 
         if response.status_code == 301:
             old = self.base
@@ -1,5 +1,5 @@
+import codecs
 import csv
-import io
 
 from ._reqs import URLRequest
 from ..exceptions import RequestError
@@ -17,8 +17,25 @@ class CSVRequest(URLRequest):
             raise RequestError(
                 msg, code=response.status_code, text=response.text, response=response)
 
-        # Requesting the text content of the response doesn't remove the BOM so
-        # we request the binary content and decode it ourselves to remove it.
-        f = io.StringIO(response.content.decode('utf-8-sig'))
-        headers = [x.strip('"\'').lower() for x in f.readline().strip().split(',')]
-        return csv.DictReader(f, fieldnames=headers)
+        lines = _iter_lines(response)
+        headers = [x.strip('"\'').lower() for x in next(lines, '').strip().split(',')]
+        return csv.DictReader(lines, fieldnames=headers)
+
+
+def _iter_lines(response, size=64*1024):
+    """Iterate over the decoded lines of a streamed response.
+
+    Unlike requests' iter_lines(), line endings are kept so multiline fields
+    are parsed correctly.
+    """
+    # Requesting the text content of the response doesn't remove the BOM so
+    # we decode the binary content ourselves to remove it.
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    for chunk in response.iter_content(chunk_size=size):
+        *lines, pending = (pending + decoder.decode(chunk)).split('\n')
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
@@ -0,0 +1,117 @@
+"""Support generic GraphQL services."""
+
+try: import simplejson as json
+except ImportError: import json
+
+from ._json import Json
+from ._reqs import _BasePagedRequest, Request
+from ..exceptions import BiteError
+
+
+class Graphql(Json):
+    """Support generic GraphQL services.
+
+    Spec docs: https://spec.graphql.org/
+    """
+
+    @staticmethod
+    def _encode_request(query, variables=None):
+        """Encode the data body for a request."""
+        data = {'query': query}
+        if variables:
+            data['variables'] = variables
+        return json.dumps(data)
+
+    @staticmethod
+    def _decode_request(request):
+        """Decode the data body of a request."""
+        data = json.loads(request.data)
+        return data['query'], data.get('variables', {})
+
+    def parse_response(self, response, partial=False, **kw):
+        """Parse the returned response.
+
+        With partial enabled, data is returned alongside any errors for
+        specific result fields, mapped from their response paths.
+        """
+        data = super().parse_response(response, **kw)
+        errors = data.get('errors')
+        if partial and data.get('data') is not None:
+            paths = {}
+            for error in errors or ():
+                path = error.get('path')
+                if not path:
+                    break
+                paths[tuple(path)] = error.get('message', 'unknown error')
+            else:
+                return data['data'], paths
+        if errors:
+            msg = '; '.join(x.get('message', 'unknown error') for x in errors)
+            self.handle_error(code=response.status_code, msg=msg)
+        return data['data']
+
+
+class GraphqlRequest(Request):
+    """Construct a GraphQL request.
+
+    Request params are passed as the query's variables.
+    """
+
+    def __init__(self, *, query, **kw):
+        super().__init__(method='POST', **kw)
+        self.query = query
+
+    def _finalize(self):
+        """Encode the data body of the request."""
+        super()._finalize()
+        self._req.data = self.service._encode_request(self.query, self.params)
+
+
+class GraphqlPagedRequest(_BasePagedRequest, GraphqlRequest):
+    """Keep requesting cursor paginated connection results until all are returned.
+
+    Queries page through a connection using `$size` and `$cursor` variables,
+    requesting the connection's `pageInfo { hasNextPage endCursor }` fields.
+
+    Docs: https://graphql.org/learn/pagination/
+    """
+
+    _size_key = 'size'
+    _cursor_key = 'cursor'
+
+    # path to the paged connection in response data
+    _connection = ()
+
+    def __init__(self, limit=None, offset=None, **kw):
+        if offset is not None:
+            raise BiteError('cursor paginated queries don\'t support offsets')
+        super().__init__(**kw)
+
+        # set a search limit to make continued requests work as expected
+        if limit is not None:
+            self.params[self._size_key] = limit
+            self.options.append(f'Limit: {limit}')
+
+        # cursor for the next page
+        self._next_cursor = None
+
+    def _finalize(self):
+        if self._size_key not in self.params and self.service.max_results is not None:
+            self.params[self._size_key] = self.service.max_results
+        super()._finalize()
+
+    def parse(self, data):
+        """Extract the paged connection from the response data."""
+        for key in self._connection:
+            data = data[key]
+        page_info = data['pageInfo']
+        self._next_cursor = page_info['endCursor'] if page_info['hasNextPage'] else None
+        return super().parse(data)
+
+    def next_page(self):
+        # no more results exist, stop requesting them
+        if self._next_cursor is None:
+            raise StopIteration
+
+        self.params[self._cursor_key] = self._next_cursor
+        self._finalized = False
@@ -5,7 +5,9 @@ from snakeoil.klass import steal_docs
 
 from . import Service
 from ._json import Json
-from ._rpc import Rpc
+from ._reqs import ExtractData, FollowupRequest, NullRequest, Request
+from ._rpc import Rpc, RPCRequest
+from ..exceptions import RequestError
 
 
 class MulticallIterator(object):
@@ -41,6 +43,81 @@ class MulticallIterator(object):
             raise TypeError(f"unexpected multicall result: {item!r}")
 
 
+class _BatchResults(ExtractData):
+    """Mark rejected batch requests instead of raising errors so they can be resent."""
+
+    # JSON-RPC error codes for unparsable or invalid request objects
+    _rejected_codes = (-32700, -32600)
+
+    def handle_exception(self, e):
+        if e.code in self._rejected_codes:
+            return None
+        raise e
+
+
+class BatchRequest(FollowupRequest, Request):
+    """Construct a JSON-RPC 2.0 batch request.
+
+    Multiple RPC calls are merged into a single HTTP request and their results
+    are matched back to the related requests by ID. If the service rejects the
+    batch, the requests are resent separately.
+
+    Spec: http://www.jsonrpc.org/specification#batch
+    """
+
+    _iterate = _BatchResults
+
+    def __init__(self, *, reqs, **kw):
+        super().__init__(method='POST', **kw)
+        self.reqs = reqs
+
+    def _finalize(self):
+        """Encode the data body of the request."""
+        super()._finalize()
+        calls = []
+        for id, req in enumerate(self.reqs):
+            if isinstance(req, NullRequest):
+                continue
+            # inject auth params if required
+            if not req._finalized:
+                req._finalize()
+            params = req.encode_params()
+            call = self.service._encode_call(req.command, params if params else None, id)
+            call['jsonrpc'] = '2.0'
+            calls.append(call)
+        self._req.data = json.dumps(calls)
+
+    def parse(self, data):
+        self._rejected = not isinstance(data, list)
+        if self._rejected:
+            return
+
+        results = {x.get('id'): x for x in data}
+        for id, req in enumerate(self.reqs):
+            if isinstance(req, NullRequest):
+                yield req.parse(None)
+                continue
+            try:
+                result = results[id]
+            except KeyError:
+                raise RequestError(f'missing batch result for request ID: {id}')
+            error = result.get('error')
+            if error is not None:
+                # assume error object follows json-rpc 2.0 spec formatting
+                self.service.handle_error(code=error['code'], msg=error['message'])
+            yield req.parse(result['result'])
+
+    def followups(self, results):
+        if not self._rejected:
+            return ()
+        # batches aren't supported, fallback to sending requests separately
+        self.service._batch_requests = False
+        return self.reqs
+
+    def combine(self, results, data):
+        return data if self._rejected else results
+
+
 class Jsonrpc(Json, Rpc):
     """Support generic JSON-RPC 1.0 services.
 
@@ -49,20 +126,36 @@ class Jsonrpc(Json, Rpc):
 
     _multicall_iter = MulticallIterator
 
-    @staticmethod
+    # assume JSON-RPC 2.0 batches are supported until the service rejects one
+    _batch_requests = True
+
     @steal_docs(Service)
-    def _encode_request(method, params=None, id=0):
+    def batch(self, reqs):
+        reqs = tuple(reqs)
+        if self._batch_requests and all(
+                isinstance(r, NullRequest) or (isinstance(r, RPCRequest) and not r._reqs)
+                for r in reqs):
+            return BatchRequest(reqs=reqs, service=self)
+        return super().batch(reqs)
+
+    @staticmethod
+    def _encode_call(method, params=None, id=0):
+        """Encode a method call object."""
         if isinstance(params, (list, tuple)):
             params = tuple(params)
         else:
             params = (params,) if params is not None else ()
 
-        data = {
+        return {
             'method': method,
             'params': params,
             'id': id,
         }
-        return json.dumps(data)
+
+    @classmethod
+    @steal_docs(Service)
+    def _encode_request(cls, method, params=None, id=0):
+        return json.dumps(cls._encode_call(method, params, id))
 
     @staticmethod
     @steal_docs(Service)
@@ -76,6 +169,9 @@ class Jsonrpc(Json, Rpc):
     def parse_response(self, response, **kw):
         """Parse the returned response."""
         data = super().parse_response(response, **kw)
+        if isinstance(data, list):
+            # batch results are matched to their requests by the batch itself
+            return data
         error = data.get('error')
         if error is None:
             return data['result']
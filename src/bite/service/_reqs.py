@@ -1,4 +1,8 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+import copy
 from functools import partial
+from itertools import islice
 import re
 from urllib.parse import urlencode
 
@@ -87,6 +91,16 @@ class Request(object):
     def encode_params(self, params=None):
         return params if params is not None else self.params
 
+    def _copy(self, params):
+        """Create an unfinalized copy of the request using the given params."""
+        req = copy.copy(self)
+        req.params = params
+        req.options = list(self.options)
+        if self._req is not None:
+            req._req = requests.Request(method=self.method, url=self._req.url)
+        req._finalized = False
+        return req
+
     def _finalize(self):
         """Finalize a request object for sending.
 
@@ -197,8 +211,11 @@ class NullRequest(Request):
 
 class _BasePagedRequest(Request):
 
-    # total results parameter key for a related service query
+    # query size and total results parameter keys for a related service query
+    _size_key = None
     _total_key = None
+    # query size used when only requesting the total number of results
+    _count_size = 1
 
     def __init__(self, **kw):
         super().__init__(**kw)
@@ -219,7 +236,9 @@ class _BasePagedRequest(Request):
             # response objects based on how expensive it is to compute so allow
             # it to be missing.
             if self._total_key is not None:
-                self._total = int(data.get(self._total_key))
+                total = data.get(self._total_key)
+                if total is not None:
+                    self._total = int(total)
         return super().parse(data)
 
     def send(self):
@@ -238,6 +257,52 @@ class _BasePagedRequest(Request):
         """Modify a request in order to grab the next page of results."""
         raise StopIteration
 
+    def _count_params(self):
+        """Return the params for a query requesting only the total number of results.
+
+        None is returned if the service doesn't provide result totals.
+        """
+        if self._size_key is None or self._total_key is None:
+            return None
+        params = self.params.copy()
+        params[self._size_key] = self._count_size
+        return params
+
+    def count_request(self):
+        """Create a request returning the total number of matching results.
+
+        None is returned if the service doesn't provide result totals.
+        """
+        params = self._count_params()
+        if params is None:
+            return None
+        return _CountRequest(self._copy(params))
+
+    def parse_count(self, response):
+        """Extract the total number of matching results from a count request response."""
+        data = self.service.parse_response(response)
+        total = data.get(self._total_key)
+        return int(total) if total is not None else None
+
+
+class _CountRequest(Request):
+    """Request only the total number of results matching a paged query.
+
+    The query's HTTP requests are sent as is with their responses being parsed
+    by the query's parse_count() method instead of its regular parsing.
+    """
+
+    def __init__(self, query):
+        super().__init__(service=query.service)
+        self._query = query
+
+    @property
+    def _requests(self):
+        yield from self._query._requests
+
+    def parse_response(self, response):
+        return self._query.parse_count(response)
+
 
 # TODO: run these asynchronously
 class PagedRequest(_BasePagedRequest):
@@ -365,9 +430,13 @@ class OffsetPagedRequest(_BasePagedRequest):
         self._finalized = False
 
 
-# TODO: run these asynchronously
 class LinkPagedRequest(_BasePagedRequest):
-    """Keep requesting matching records until all relevant result pages are returned."""
+    """Keep requesting matching records until all relevant result pages are returned.
+
+    If responses include the total number of results along with the current
+    page and page size, the remaining pages are requested concurrently after
+    the first one. Otherwise, next page links are followed.
+    """
 
     # paging related parameter keys for a related service query
     _page = None
@@ -375,6 +444,9 @@ class LinkPagedRequest(_BasePagedRequest):
     _next = None
     _previous = None
 
+    # number of remaining pages to request concurrently
+    _concurrent_pages = 4
+
     def __init__(self, **kw):
         super().__init__(**kw)
 
@@ -383,12 +455,62 @@ class LinkPagedRequest(_BasePagedRequest):
 
         # link to next page
         self._next_page = None
+        # current page number and size from the last response
+        self._page_num = None
+        self._page_size = None
 
     def _finalize(self):
         if self._pagelen not in self.params and self.service.max_results is not None:
             self.params[self._pagelen] = self.service.max_results
         super()._finalize()
 
+    def send(self):
+        """Send a request object to the related service."""
+        data = self.service.send(self)
+        while True:
+            for x in data:
+                self._seen += 1
+                yield x
+
+            pages = self._remaining_pages()
+            if pages is not None:
+                yield from self._send_pages(pages)
+                return
+
+            try:
+                self.next_page()
+            except StopIteration:
+                return
+            data = self.service.send(self)
+
+    def _remaining_pages(self):
+        """Return the numbers of all remaining pages if they're known."""
+        if None in (self._total, self._page_num) or not self._page_size:
+            return None
+        last = -(-self._total // self._page_size)
+        return range(self._page_num + 1, last + 1)
+
+    def _page_request(self, page):
+        """Create a request for a given page of results."""
+        params = self.params.copy()
+        params[self._page] = page
+        return self._copy(params)
+
+    def _send_pages(self, pages):
+        """Request pages in order, keeping a bounded number of them in flight."""
+        pages = iter(pages)
+
+        def submit(n):
+            return self.service.submit(*(self._page_request(x) for x in islice(pages, n)))
+
+        pending = deque(submit(self._concurrent_pages))
+        while pending:
+            data = pending.popleft().result()
+            pending.extend(submit(1))
+            for x in data:
+                self._seen += 1
+                yield x
+
     def next_page(self):
         # no more results exist, stop requesting them
         if self._next_page is None:
@@ -400,6 +522,8 @@ class LinkPagedRequest(_BasePagedRequest):
     def parse(self, data):
         """Parse the data returned from a given request."""
         self._next_page = data.get(self._next)
+        self._page_num = data.get(self._page)
+        self._page_size = data.get(self._pagelen)
         return super().parse(data)
 
 
@@ -419,13 +543,30 @@ class LinkHeaderPagedRequest(_BasePagedRequest):
 
         # link to next page
         self._next_page = None
+        # Request the next page as soon as its link header is received,
+        # overlapping its transfer with decoding and parsing the current page.
+        self._prefetch = False
+        self._next_link = Future()
 
     def parse_response(self, response):
         if self._total_header is not None:
-            self._total = int(response.headers.get(self._total_header))
+            total = response.headers.get(self._total_header)
+            # some services skip totals for expensive queries
+            if total is not None:
+                self._total = int(total)
         self._next_page = response.links.get('next', {}).get('url')
+        if self._prefetch:
+            self._next_link.set_result(self._next_page)
         return self.service.parse_response(response)
 
+    def parse_count(self, response):
+        if self._total_header is None:
+            return super().parse_count(response)
+        # check for errors in the response
+        self.service.parse_response(response)
+        total = response.headers.get(self._total_header)
+        return int(total) if total is not None else None
+
     def next_page(self):
         # no more results exist, stop requesting them
         if self._next_page is None:
@@ -434,6 +575,139 @@ class LinkHeaderPagedRequest(_BasePagedRequest):
         # set offset and send new request
         self._req.url = self._next_page
 
+    def _copy(self, params):
+        req = super()._copy(params)
+        req._next_link = Future()
+        return req
+
+    def _link_request(self, url):
+        """Create a request for the page at a given link."""
+        req = self._copy(self.params.copy())
+        req._finalize()
+        req._req.url = url
+        return req
+
+    def send(self):
+        """Send a request object to the related service."""
+        if not self._prefetch:
+            yield from super().send()
+            return
+
+        req = self
+        data, = self.service.submit(req)
+        while True:
+            # the link is set before the page is parsed, unless the request failed
+            wait((req._next_link, data), return_when=FIRST_COMPLETED)
+            next_req = None
+            if req._next_link.done() and req._next_link.result() is not None:
+                next_req = self._link_request(req._next_link.result())
+                next_data, = self.service.submit(next_req)
+
+            for x in data.result():
+                self._seen += 1
+                yield x
+
+            if next_req is None:
+                return
+            req, data = next_req, next_data
+
+
+class ShardedRequest(Request):
+    """Split a query into disjoint shards that are requested concurrently.
+
+    Shards are ranges over a key that results are sorted by (e.g. IDs or
+    creation times) so concatenating their results in order retains the
+    requested sort order. The initial shard is the unmodified query, shards
+    that hit the service's result cap are subdivided with the resulting
+    subshards being requested in parallel.
+    """
+
+    # number of subshards a full shard is split into
+    _shard_splits = 8
+
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        # only shard queries that aren't explicitly limited to a results window
+        self._sharded = self._shardable()
+
+    def _shardable(self):
+        """Determine if the query can be split into shards."""
+        return False
+
+    def _shard_request(self, shard):
+        """Create a request for the query restricted to a given shard.
+
+        The initial shard covering the entire query is passed as None.
+        """
+        raise NotImplementedError
+
+    def _shard_followups(self, shard, req, items):
+        """Return requests needed to split a shard, given its parsed results."""
+        return ()
+
+    def _split_shard(self, shard, req, items, data):
+        """Merge a shard's results with the results of its follow-up requests.
+
+        Returns a tuple of the results in sorted order and the ordered subshards
+        covering the remaining, unrequested range of the shard.
+        """
+        raise NotImplementedError
+
+    def send(self):
+        """Send a request object to the related service."""
+        if not self._sharded:
+            yield from super().send()
+            return
+
+        shards = deque(self.service.submit(_ShardRequest(self, None)))
+        while shards:
+            results, subshards = shards.popleft().result()
+            shards.extendleft(reversed(
+                self.service.submit(*(_ShardRequest(self, x) for x in subshards))))
+            yield from results
+
+
+class FollowupRequest(Request):
+    """Request spawning follow-up requests that depend on its parsed results.
+
+    The parsed results are collected into a tuple and passed to followups()
+    which returns the dependent requests. Once those are completed, the
+    parsed results and the follow-up request results are passed to
+    combine(). The service schedules the stages as their dependencies
+    resolve so no worker threads are blocked waiting on them.
+    """
+
+    # extra HTTP send options for follow-up requests
+    _followup_kw = {}
+
+    def followups(self, items):
+        """Return requests depending on the parsed results."""
+        return ()
+
+    def combine(self, items, data):
+        """Merge the parsed results with the follow-up request results."""
+        return items
+
+
+class _ShardRequest(FollowupRequest):
+    """Request a shard of a sharded query, resolving to its results and subshards."""
+
+    def __init__(self, query, shard):
+        self._query = query
+        self._shard = shard
+        self._shard_req = query._shard_request(shard)
+        super().__init__(service=query.service, reqs=(self._shard_req,))
+
+    def parse(self, data):
+        items, = data
+        return items
+
+    def followups(self, items):
+        return self._query._shard_followups(self._shard, self._shard_req, items)
+
+    def combine(self, items, data):
+        return self._query._split_shard(self._shard, self._shard_req, items, data)
+
 
 class ParseRequest(Request):
     """Parse parameters according to defined methods for a request."""
@@ -577,7 +851,7 @@ class BaseCommentsRequest(Request):
                 if self.modified is not None:
                     comments = (x for x in comments if x.modified in self.modified)
                 if self.attachment:
-                    comments = (x for x in comments if x.changes['attachment_id'] is not None)
+                    comments = (x for x in comments if x.changes.get('attachment_id') is not None)
                 if self.comment_num is not None:
                     if any(x < 0 for x in self.comment_num):
                         comments = list(comments)
@@ -665,10 +939,10 @@ class BaseGetRequest(Request):
                 reqs.append(getattr(self.service, f'{call.capitalize()}Request')(ids=ids))
             else:
                 reqs.append(NullRequest())
-        self._reqs = tuple(reqs)
+        self._reqs = (self.service.batch(reqs),)
 
     def parse(self, data):
-        items, comments, attachments, changes = data
+        items, comments, attachments, changes = next(data)
         for item in items:
             item.comments = next(comments)
             item.attachments = next(attachments)
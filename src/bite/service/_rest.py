@@ -19,6 +19,11 @@ class RESTRequest(URLRequest):
         super().__init__(**kw)
         self.data = {}
 
+    def _copy(self, params):
+        req = super()._copy(params)
+        req.data = self.data.copy()
+        return req
+
     def params_to_data(self):
         """Convert params to encoded request data."""
         self.data.update(self.params)
@@ -0,0 +1,146 @@
+"""Process-wide scheduling of service requests."""
+
+import atexit
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from multiprocessing import cpu_count
+import threading
+
+
+class Scheduler(object):
+    """Run the tasks of all services using one bounded pool of worker threads.
+
+    Tasks are queued per host with workers starting them round-robin across
+    hosts so concurrent services share the pool fairly, each host also being
+    limited to its own number of tasks in flight. Tasks submitted by workers
+    that can't be started immediately are run inline by the submitting worker
+    so tasks waiting on their subtasks can't exhaust the pool.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers if max_workers is not None else max(32, cpu_count() * 5)
+        # host -> queued tasks
+        self._queues = OrderedDict()
+        # host -> number of running tasks
+        self._running = {}
+        self._threads = []
+        # number of waiting workers that haven't been woken
+        self._idle = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._done = threading.Condition(self._lock)
+
+    def executor(self, host, max_workers=None):
+        """Create an executor submitting tasks for a given host."""
+        return HostExecutor(self, host, max_workers)
+
+    def _startable(self, host, limit):
+        """Determine if a host's task can be started immediately."""
+        if self._queues.get(host) or self._running.get(host, 0) >= limit:
+            return False
+        return bool(self._idle) or len(self._threads) < self.max_workers
+
+    def submit(self, host, limit, func, *args, **kw):
+        """Queue a function to be run for a host, returning its future."""
+        future = Future()
+        task = (host, limit, future, func, args, kw)
+
+        with self._lock:
+            inline = getattr(self._local, 'worker', False) and not self._startable(host, limit)
+            if inline:
+                self._running[host] = self._running.get(host, 0) + 1
+            else:
+                self._queues.setdefault(host, deque()).append(task)
+                self._wake()
+
+        if inline:
+            self._run(task, inline=True)
+        return future
+
+    def _wake(self):
+        """Wake an idle worker or start a new one if the pool isn't full."""
+        if self._idle:
+            self._idle -= 1
+            self._work.notify()
+        elif len(self._threads) < self.max_workers:
+            t = threading.Thread(target=self._worker, daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def _next(self):
+        """Pop the next startable task, rotating through hosts."""
+        for host, queue in self._queues.items():
+            if queue and self._running.get(host, 0) < queue[0][1]:
+                self._queues.move_to_end(host)
+                self._running[host] = self._running.get(host, 0) + 1
+                return queue.popleft()
+        return None
+
+    def _run(self, task, inline=False):
+        """Run a task, marking its host's slot free once it's done."""
+        host, _limit, future, func, args, kw = task
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = func(*args, **kw)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            with self._lock:
+                self._running[host] -= 1
+                # workers pull the next task themselves, but inline tasks
+                # may be holding up queued ones for the host
+                if inline and self._queues.get(host):
+                    self._wake()
+                self._done.notify_all()
+
+    def _worker(self):
+        self._local.worker = True
+        while True:
+            with self._lock:
+                task = self._next()
+                while task is None:
+                    self._idle += 1
+                    self._work.wait()
+                    task = self._next()
+            self._run(task)
+
+    def join(self):
+        """Wait for all queued and running tasks to complete."""
+        with self._lock:
+            while any(self._queues.values()) or any(self._running.values()):
+                self._done.wait()
+
+    def cancel(self):
+        """Cancel all queued tasks, running tasks are left to finish."""
+        with self._lock:
+            tasks = [task for queue in self._queues.values() for task in queue]
+            self._queues.clear()
+            self._done.notify_all()
+        for _host, _limit, future, *_ in tasks:
+            future.cancel()
+
+
+class HostExecutor(object):
+    """Executor submitting a host's tasks to a shared scheduler."""
+
+    # default max tasks in flight for a host
+    default_max_workers = cpu_count() * 5
+
+    def __init__(self, scheduler, host, max_workers=None):
+        self.scheduler = scheduler
+        self.host = host
+        # max tasks in flight for the host
+        self.max_workers = max_workers if max_workers is not None else self.default_max_workers
+
+    def submit(self, func, *args, **kw):
+        return self.scheduler.submit(self.host, self.max_workers, func, *args, **kw)
+
+
+scheduler = Scheduler()
+# don't start queued tasks while exiting, workers are daemon threads so
+# running tasks don't delay exiting
+atexit.register(scheduler.cancel)
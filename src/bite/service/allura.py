@@ -9,19 +9,19 @@ API docs:
 import html
 import re
 
-from dateutil.parser import parse as dateparse
 from snakeoil.klass import aliased, alias
 
 from ._jsonrest import JsonREST
 from ._reqs import (
-    NullRequest, Request, req_cmd,
+    FollowupRequest, NullRequest, Request, req_cmd,
     FlaggedPagedRequest, PagedRequest, QueryParseRequest,
     BaseCommentsRequest, BaseChangesRequest,
 )
 from ._rest import RESTRequest
+from ..cache import Index
 from ..exceptions import BiteError, RequestError
 from ..objects import Item, Comment, Attachment, Change, TimeInterval
-from ..utc import utc
+from ..utc import utc, parse_timestamp as dateparse
 
 
 class AlluraError(RequestError):
@@ -123,6 +123,8 @@ class AlluraTicket(Item):
 
 class AlluraComment(Comment):
 
+    __slots__ = ()
+
     @classmethod
     def parse(cls, data):
         for posts in data:
@@ -155,6 +157,8 @@ class AlluraAttachment(Attachment):
 
 class AlluraEvent(Change):
 
+    __slots__ = ()
+
     @classmethod
     def parse(cls, data):
         for posts in data:
@@ -222,6 +226,13 @@ class Allura(JsonREST):
             endpoint=endpoint, base=api_base, max_results=max_results, **kw)
         self.webbase = base
 
+        # map of ticket IDs to their discussion thread IDs
+        self.thread_ids = Index(self.connection, 'threads')
+
+    def _index_threads(self, items):
+        """Add the discussion thread IDs for items to the index."""
+        self.thread_ids.update((x.ticket_num, x.thread_id) for x in items)
+
     def inject_auth(self, request, params):
         raise NotImplementedError
 
@@ -271,9 +282,9 @@ class _SearchRequest(QueryParseRequest, AlluraPagedRequest):
 
     def parse(self, data):
         data = super().parse(data)
-        tickets = data['tickets']
-        for ticket in tickets:
-            yield self.service.item(self.service, **ticket)
+        items = [self.service.item(self.service, **x) for x in data['tickets']]
+        self.service._index_threads(items)
+        yield from items
 
     @aliased
     class ParamParser(QueryParseRequest.ParamParser):
@@ -398,10 +409,13 @@ class _GetItemRequest(Request):
         self._get_attach = get_attachments
 
     def parse(self, data):
-        for item in data:
-            yield self.service.item(
+        items = [
+            self.service.item(
                 self.service, get_desc=self._get_desc, get_attachments=self._get_attach,
-                **item['ticket'])
+                **x['ticket'])
+            for x in data]
+        self.service._index_threads(items)
+        yield from items
 
 
 class _ThreadRequest(Request):
@@ -412,12 +426,16 @@ class _ThreadRequest(Request):
         if ids is None:
             raise ValueError(f'No ID(s) specified')
 
-        # pull thread IDs from items
+        # pull thread IDs for items, searching for the ones that aren't indexed
         if item_id:
-            self.service.client.progress_output('Determining message thread IDs')
             self.options.append(f"IDs: {', '.join(map(str, ids))}")
-            items = self.service.SearchRequest(id=ids).send()
-            ids = [x.thread_id for x in items]
+            missing = [x for x in ids if x not in self.service.thread_ids]
+            if missing:
+                self.service.client.progress_output('Determining message thread IDs')
+                # matching items are indexed while parsing
+                for _ in self.service.SearchRequest(id=missing).send():
+                    pass
+            ids = [self.service.thread_ids[x] for x in ids if x in self.service.thread_ids]
 
         if data is None:
             reqs = []
@@ -470,7 +488,7 @@ class _ChangesRequest(BaseChangesRequest, _ThreadRequest):
 
 
 @req_cmd(Allura, cmd='get')
-class _GetRequest(_GetItemRequest):
+class _GetRequest(FollowupRequest, _GetItemRequest):
     """Construct requests to retrieve all known data for given issue IDs."""
 
     def __init__(self, get_comments=True, get_attachments=True, get_changes=False, **kw):
@@ -478,18 +496,37 @@ class _GetRequest(_GetItemRequest):
         self._get_comments = get_comments
         self._get_attachments = get_attachments
         self._get_changes = get_changes
+        self._get_threads = any((get_comments, get_attachments, get_changes))
+        self._threads = None
+
+        # request discussion threads alongside the items if their IDs are indexed
+        thread_ids = self.service.thread_ids.lookup(self.ids) if self._get_threads else None
+        self._prefetch = thread_ids is not None
+        if self._prefetch:
+            self._reqs = (
+                Request(service=self.service, reqs=self._reqs),
+                _ThreadRequest(service=self.service, ids=thread_ids))
 
     def parse(self, data):
-        items = list(super().parse(data))
+        if self._prefetch:
+            data, self._threads = data
+        return super().parse(data)
+
+    def followups(self, items):
+        if self._get_threads and not self._prefetch:
+            # request discussion thread data
+            thread_ids = [x.thread_id for x in items]
+            return (_ThreadRequest(service=self.service, ids=thread_ids),)
+        return ()
+
+    def combine(self, items, data):
         comments = self._none_gen
         attachments = self._none_gen
         changes = self._none_gen
 
-        if any((self._get_comments, self._get_attachments, self._get_changes)):
-            # request discussion thread data
+        if self._get_threads:
+            threads = list(data[0] if data else self._threads)
             thread_ids = [x.thread_id for x in items]
-            thread_req = _ThreadRequest(service=self.service, ids=thread_ids)
-            threads = list(thread_req.send())
             if self._get_comments:
                 item_descs = ((x.description,) for x in items)
                 item_comments = self.service.CommentsRequest(
@@ -10,7 +10,6 @@ Updates:
 
 from warnings import warn
 
-from dateutil.parser import parse as dateparse
 from multidict import MultiDict
 from snakeoil.klass import aliased, alias
 
@@ -22,6 +21,7 @@ from ._reqs import (
 from ._rest import RESTRequest
 from ..exceptions import BiteError, RequestError
 from ..objects import Item, Comment, Attachment, Change, TimeInterval
+from ..utc import parse_timestamp as dateparse
 
 
 class BitbucketError(RequestError):
@@ -124,6 +124,8 @@ class BitbucketExtractData(ExtractData):
 
 class BitbucketComment(Comment):
 
+    __slots__ = ()
+
     @classmethod
     def parse(cls, data):
         for comments in data:
@@ -146,6 +148,8 @@ class BitbucketAttachment(Attachment):
 
 class BitbucketEvent(Change):
 
+    __slots__ = ()
+
     def __init__(self, id, count, change):
         creator = change['user']
         if creator is not None:
@@ -549,7 +553,7 @@ class _GetRequest(BaseGetRequest):
         self._get_comments = get_comments
 
     def parse(self, data):
-        items, comments, attachments, changes = data
+        items, comments, attachments, changes = next(data)
         for item in items:
             # Prepend comment for description which is provided by
             # GetItemRequest instead of CommentsRequest.
@@ -10,7 +10,7 @@ from snakeoil.mappings import ImmutableDict
 
 from .objects import BugzillaBug, BugzillaAttachment
 from .. import Service
-from ...cache import Cache, csv2tuple
+from ...cache import Cache
 from ...exceptions import RequestError, AuthError
 
 
@@ -24,6 +24,9 @@ class BugzillaError(RequestError):
 
 class BugzillaCache(Cache):
 
+    # refresh statuses and products weekly
+    ttl = 7 * 24 * 60 * 60
+
     def __init__(self, **kw):
         # default to bugzilla-5 open/closed statuses
         defaults = {
@@ -31,12 +34,7 @@ class BugzillaCache(Cache):
             'closed_status': ('RESOLVED', 'VERIFIED'),
         }
 
-        converters = {
-            'open_status': csv2tuple,
-            'closed_status': csv2tuple,
-        }
-
-        super().__init__(defaults=defaults, converters=converters, **kw)
+        super().__init__(defaults=defaults, **kw)
 
 
 class Bugzilla(Service):
@@ -69,7 +67,7 @@ class Bugzilla(Service):
         # get server bugzilla version
         reqs.append(self.VersionRequest())
 
-        statuses, products, version = self.send(reqs)
+        statuses, products, version = self.send(self.batch(reqs))
 
         open_status = []
         closed_status = []
@@ -1,17 +1,20 @@
 """Support Bugzilla's deprecated JSON-RPC interface."""
 
-try: import simplejson as json
-except ImportError: import json
-
-from ._rpc import Bugzilla4_4Rpc, Bugzilla5_0Rpc, Bugzilla5_2Rpc, _SearchRequest5_0
+from . import _rpc
+from ._rpc import Bugzilla4_4Rpc, Bugzilla5_0Rpc, Bugzilla5_2Rpc
+from .objects import BugzillaComment
 from .._jsonrpc import Jsonrpc
+from .._reqs import req_cmd
+from ...exceptions import BiteError
 
 
 class _BugzillaJsonrpcBase(Jsonrpc):
     """Base service class for Bugzilla JSON-RPC interface."""
 
-    def __init__(self, **kw):
+    def __init__(self, stream=False, **kw):
         super().__init__(endpoint='/jsonrpc.cgi', **kw)
+        # incrementally decode search, changes, and comments results
+        self.stream = stream
 
 
 class Bugzilla4_4Jsonrpc(_BugzillaJsonrpcBase, Bugzilla4_4Rpc):
@@ -36,41 +39,121 @@ class BugzillaJsonrpc(_BugzillaJsonrpcBase, Bugzilla5_2Rpc):
     _service = 'bugzilla5.2-jsonrpc'
 
 
-# TODO: note that this currently isn't being kept up to date
-class _StreamingBugzillaJsonrpc(BugzillaJsonrpc):
+class _JsonStream(object):
+    """File-like wrapper incrementally decoding a JSON-RPC response."""
+
+    def __init__(self, response, service, size=64*1024):
+        try:
+            import ijson
+        except ImportError:
+            raise BiteError('streaming support requires ijson')
+        self._ijson = ijson
+        self.chunks = response.iter_content(chunk_size=size)
+        self.service = service
+
+    def read(self, size=-1):
+        # ijson probes the data type with zero-sized reads
+        if size == 0:
+            return b''
+        return next(self.chunks, b'')
+
+    def _events(self):
+        """Generate JSON parsing events, raising any returned JSON-RPC error."""
+        from ijson.common import ObjectBuilder
+        events = self._ijson.parse(self)
+        for prefix, event, value in events:
+            if prefix == 'error' and event != 'null':
+                builder = ObjectBuilder()
+                builder.event(event, value)
+                depth = 1 if event in ('start_map', 'start_array') else 0
+                while depth:
+                    prefix, event, value = next(events)
+                    builder.event(event, value)
+                    if event in ('start_map', 'start_array'):
+                        depth += 1
+                    elif event in ('end_map', 'end_array'):
+                        depth -= 1
+                error = builder.value
+                if isinstance(error, dict):
+                    # assume error object follows json-rpc 2.0 spec formatting
+                    code, msg = error.get('code'), error.get('message')
+                else:
+                    code, msg = None, error
+                self.service.handle_error(code=code, msg=msg)
+            yield prefix, event, value
+
+    def items(self, prefix):
+        """Iterate over the objects in the array located at a given prefix."""
+        return self._ijson.items(self._events(), f'{prefix}.item')
+
+    def kvitems(self, prefix):
+        """Iterate over the key/value pairs in the object located at a given prefix."""
+        return self._ijson.kvitems(self._events(), prefix)
+
+
+class _StreamingRequest(object):
+    """Request that optionally decodes its results as they're received.
+
+    When streaming is enabled for the service, the data passed to the parse()
+    method holds lazily decoded results instead of the fully loaded response.
+    """
 
-    _service = None
+    # result field containing the streamed objects
+    _stream_field = 'bugs'
+    # whether the streamed field is a mapping instead of an array
+    _stream_mapping = False
 
     def parse_response(self, response):
-        return self._IterContent(response)
+        if not (self.service.stream and
+                response.headers.get('Content-Type', '').startswith('application/json')):
+            # fallback to the regular parser, raising any related error
+            return self.service.parse_response(response)
+
+        stream = _JsonStream(response, self.service)
+        prefix = f'result.{self._stream_field}'
+        if self._stream_mapping:
+            return {self._stream_field: stream.kvitems(prefix)}
+        return {self._stream_field: stream.items(prefix)}
+
+
+@req_cmd(Bugzilla4_4Jsonrpc, cmd='search')
+class _SearchRequest4_4(_StreamingRequest, _rpc._SearchRequest4_4):
+    """Construct a search request."""
+
+
+@req_cmd(BugzillaJsonrpc, cmd='search')
+@req_cmd(Bugzilla5_0Jsonrpc, cmd='search')
+class _SearchRequest5_0(_StreamingRequest, _rpc._SearchRequest5_0):
+    """Construct a search request."""
+
 
-    class SearchRequest(_SearchRequest5_0):
+@req_cmd(_BugzillaJsonrpcBase, cmd='changes')
+class _ChangesRequest(_StreamingRequest, _rpc._ChangesRequest):
+    """Construct a changes request."""
 
-        def __init__(self, **kw):
-            """Construct a search request."""
-            super().__init__(**kw)
 
-        def parse(self, data):
-            import ijson.backends.yajl2 as ijson
-            bugs = ijson.items(data, 'result.bugs.item')
-            return (self.service.item(service=self.service, bug=bug) for bug in bugs)
+@req_cmd(_BugzillaJsonrpcBase, cmd='comments')
+class _CommentsRequest(_StreamingRequest, _rpc._CommentsRequest):
+    """Construct a comments request."""
 
-    class _IterContent(object):
+    _stream_mapping = True
 
-        def __init__(self, file, size=64*1024):
-            self.initial = True
-            self.chunks = file.iter_content(chunk_size=size)
+    def parse(self, data):
+        if not self.service.stream:
+            yield from super().parse(data)
+        else:
+            yield from self.filter(self._iter_comments(data['bugs']))
 
-        def read(self, size=64*1024):
-            chunk = next(self.chunks)
-            # check the initial chunk for errors
-            if self.initial:
-                self.initial = False
+    def _iter_comments(self, bugs):
+        """Yield comments in requested bug order, only buffering bugs that arrive early."""
+        pending = {}
+        for i in self.ids:
+            while i not in pending:
                 try:
-                    error = json.loads(chunk)['error']
-                except json.decoder.JSONDecodeError as e:
-                    # if we can't load it, assume it's a valid json doc chunk
-                    return chunk
-                if error is not None:
-                    super().handle_error(error)
-            return chunk
+                    k, v = next(bugs)
+                except StopIteration:
+                    raise BiteError(f'missing comments for bug: {i}')
+                pending[k] = v
+            yield tuple(
+                BugzillaComment(comment=c, id=i, count=j)
+                for j, c in enumerate(pending.pop(i)['comments']))
@@ -3,21 +3,24 @@ import datetime
 import re
 import string
 
-from dateutil.parser import parse as dateparse
 from snakeoil.osutils import sizeof_fmt
 
 from ... import utc, const
-from ...objects import Item, Change, Comment, Attachment, decompress
+from ...objects import Item, Change, Comment, Attachment, decompress, field_change
 from ...utils import nonstring_iterable
 
 
 def parsetime(time):
     if not isinstance(time, datetime.datetime):
-        return dateparse(str(time))
+        return utc.parse_timestamp(str(time))
     else:
         return time.replace(tzinfo=utc.utc)
 
 
+# timestamp format used by custom datetime fields
+_datetime_re = re.compile(r'^\d\d\d\d-\d\d-\d\dT\d\d:\d\d:\d\dZ$')
+
+
 class BugzillaBug(Item):
     """Bugzilla bug object."""
 
@@ -118,27 +121,41 @@ class BugzillaBug(Item):
 
     type = 'bug'
 
+    _converters = {
+        'creation_time': parsetime,
+        'last_change_time': parsetime,
+    }
+
+    # fields containing user logins that get their suffixes stripped
+    _user_fields = frozenset(['assigned_to', 'creator', 'qa_contact', 'cc'])
+
     def __init__(self, service, **kw):
         self.service = service
-
-        for k, v in kw.items():
-            if not v or v == '---':
-                # skip empty lists and blank fields
-                continue
-            elif v == 'flags':
-                self.flags = [flag['name'] for flag in kw['flags']]
-            elif k in ['creation_time', 'last_change_time']:
-                setattr(self, k, parsetime(v))
-            else:
-                if isinstance(v, str) and re.match(r'^\d\d\d\d-\d\d-\d\dT\d\d:\d\d:\d\dZ$', v):
-                    setattr(self, k, parsetime(v))
-                else:
-                    setattr(self, k, v)
+        # fields are decoded on access
+        self._data = kw
+
+    def _decode_field(self, name, value):
+        if not value or value == '---':
+            # treat empty lists and blank fields as unset
+            return None
+        elif name in self._converters:
+            return self._converters[name](value)
+        elif name in self._user_fields:
+            if self.service.suffix is None:
+                return value
+            elif name == 'cc':
+                return [self.service._desuffix(x) for x in value]
+            return self.service._desuffix(value)
+        elif name.startswith('cf_') and isinstance(value, str) and _datetime_re.match(value):
+            # custom field types are unknown so check for timestamps
+            return parsetime(value)
+        return value
 
     def _custom_str_fields(self):
-        custom_fields = ((k, v) for (k, v) in vars(self).items()
-                         if re.match(r'^cf_\w+$', k))
+        custom_fields = ((k, getattr(self, k)) for k in self._data if re.match(r'^cf_\w+$', k))
         for k, v in custom_fields:
+            if v is None:
+                continue
             title = string.capwords(k[3:], '_')
             title = title.replace('_', ' ')
 
@@ -150,24 +167,16 @@ class BugzillaBug(Item):
                 # output indented list for multiline custom fields
                 prefix = '\n  '
                 value = prefix + f'{prefix}'.join(value)
-            else:
-                prefix = ''
+            elif nonstring_iterable(value):
                 value = value[0]
             yield f'{title:<12}: {value}'
 
-    def __getattribute__(self, name):
-        value = object.__getattribute__(self, name)
-        if name == 'cc' and isinstance(value, list):
-            return list(map(self.service._desuffix, value))
-        elif isinstance(value, str):
-            return self.service._desuffix(value)
-        else:
-            return value
-
 
 class BugzillaComment(Comment):
     """Bugzilla comment object."""
 
+    __slots__ = ('comment_id',)
+
     def __init__(self, comment, id, count, rest=False, **kw):
         self.comment_id = comment['id']
 
@@ -187,9 +196,8 @@ class BugzillaComment(Comment):
         else:
             text = comment['text'].strip()
 
-        changes = {}
-        if 'attachment_id' in comment:
-            changes['attachment_id'] = comment['attachment_id']
+        attachment_id = comment.get('attachment_id')
+        changes = {'attachment_id': attachment_id} if attachment_id is not None else None
 
         super().__init__(
             id=id, creator=creator, created=created,
@@ -205,6 +213,8 @@ class BugzillaComment(Comment):
 class BugzillaEvent(Change):
     """Bugzilla change object."""
 
+    __slots__ = ('alias',)
+
     change_aliases = {
         'attachment-description': 'attachments.description',
         'attachment-filename': 'attachments.filename',
@@ -262,13 +272,12 @@ class BugzillaEvent(Change):
         else:
             creator = change['who']
             created = parsetime(change['when'])
+        change_map = self._change_map
         changes = {}
         for c in change['changes']:
-            field = c['field_name']
             removed, added = c['removed'], c['added']
-            removed = self._change_map.get(removed, removed)
-            added = self._change_map.get(added, added)
-            change = (removed, added)
+            field, change = field_change(
+                c['field_name'], change_map.get(removed, removed), change_map.get(added, added))
             if field == 'attachments.isobsolete':
                 changes[field] = (c['attachment_id'], change)
             else:
@@ -7,7 +7,7 @@ from snakeoil.klass import aliased, alias
 from . import Bugzilla
 from .objects import BugzillaEvent, BugzillaComment
 from .._reqs import (
-    OffsetPagedRequest, Request, ParseRequest, req_cmd,
+    OffsetPagedRequest, Request, ParseRequest, ShardedRequest, req_cmd,
     BaseGetRequest, BaseCommentsRequest, BaseChangesRequest,
 )
 from ... import const, magic
@@ -106,7 +106,7 @@ class SearchRequest4_4(ParseRequest, OffsetPagedRequest):
             self.options.append(f"Summary: {', '.join(map(str, v))}")
 
 
-class SearchRequest5_0(SearchRequest4_4):
+class SearchRequest5_0(ShardedRequest, SearchRequest4_4):
     """Construct a bugzilla-5.0 compatible search request.
 
     Bugzilla 5.0+ allows using any parameters able to be set in the advanced
@@ -115,9 +115,76 @@ class SearchRequest5_0(SearchRequest4_4):
     determined by constructing queries using the web UI and looking at the
     resulting URL.
 
+    Queries sorted by ID that hit the service's max results are split into
+    bug ID ranges via advanced search fields that are requested in parallel.
+
     API docs: https://bugzilla.readthedocs.io/en/5.0/api/core/v1/bug.html#search-bugs
     """
 
+    def _shardable(self):
+        return (
+            self.service.max_results is not None and
+            self.params.get('order') in ('id', 'bug_id') and
+            self._size_key not in self.params and
+            self._offset_key not in self.params)
+
+    def _id_range_request(self, start=None, end=None, **kw):
+        """Create a request for the query restricted to bugs in a given ID range."""
+        params = self.params.copy()
+        params.update(kw)
+        # bug IDs are required in order to continue requesting capped shards
+        fields = params.get('include_fields')
+        if fields is not None and 'id' not in fields:
+            params['include_fields'] = ['id'] + list(fields)
+        adv_num = self.param_parser.adv_num
+        if start is not None:
+            params[f'f{adv_num}'] = 'bug_id'
+            params[f'o{adv_num}'] = 'greaterthan'
+            params[f'v{adv_num}'] = start
+            adv_num += 1
+        if end is not None:
+            params[f'f{adv_num}'] = 'bug_id'
+            params[f'o{adv_num}'] = 'lessthaneq'
+            params[f'v{adv_num}'] = end
+        return self._copy(params)
+
+    def _count_params(self):
+        params = {
+            k: v for k, v in self.params.items()
+            if k not in (self._size_key, self._offset_key, 'order', 'include_fields')}
+        params['count_only'] = 1
+        return params
+
+    def parse_count(self, response):
+        return self.service.parse_response(response)['bug_count']
+
+    def _shard_request(self, shard):
+        start, end = shard if shard is not None else (None, None)
+        return self._id_range_request(start, end, **{self._size_key: self.service.max_results})
+
+    def _shard_followups(self, shard, req, bugs):
+        if shard is None and len(bugs) >= self.service.max_results:
+            # request the last matching bug to determine the remaining ID range
+            return (self._id_range_request(
+                bugs[-1].id, order='bug_id DESC', include_fields=['id'], **{self._size_key: 1}),)
+        return ()
+
+    def _split_shard(self, shard, req, bugs, data):
+        if len(bugs) < self.service.max_results:
+            return bugs, ()
+
+        # split the remaining ID range after the last bug returned
+        start = bugs[-1].id
+        if shard is None:
+            last = next(iter(data[0]), None)
+            if last is None:
+                return bugs, ()
+            end = last.id
+        else:
+            _start, end = shard
+        step = max(-(-(end - start) // self._shard_splits), 1)
+        return bugs, tuple((x, min(x + step, end)) for x in range(start, end, step))
+
     @aliased
     class ParamParser(SearchRequest4_4.ParamParser):
 
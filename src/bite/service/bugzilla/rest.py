@@ -3,19 +3,24 @@
 from collections import deque
 
 from . import Bugzilla5_0, Bugzilla5_2
+from .objects import BugzillaComment, BugzillaEvent
 from .reqs import (
     LoginRequest, SearchRequest5_0, ChangesRequest, CommentsRequest, AttachmentsRequest,
     GetItemRequest, ModifyRequest, AttachRequest, CreateRequest,
     ExtensionsRequest, VersionRequest, FieldsRequest, ProductsRequest, UsersRequest,
 )
 from .._jsonrest import JsonREST
-from .._reqs import req_cmd
+from .._reqs import BaseGetRequest, FollowupRequest, req_cmd
 from .._rest import RESTRequest
 
 
 class _BugzillaRestBase(Bugzilla5_0, JsonREST):
     """Base service class for Bugzilla REST interface."""
 
+    # assume comments, attachments, and history can be requested inline with
+    # bug data until the server shows otherwise
+    _inline_get = True
+
     def __init__(self, **kw):
         super().__init__(endpoint='/rest', **kw)
 
@@ -119,6 +124,78 @@ class _GetItemRequest(GetItemRequest, RESTRequest):
         self.params['id'] = self.params.pop('ids')
 
 
+@req_cmd(Bugzilla5_0Rest, cmd='get')
+class _GetRequest(FollowupRequest, BaseGetRequest):
+    """Construct a get request.
+
+    Comments, attachments, and history are pulled inline with the bug data via
+    include_fields expansion in a single request. If the server doesn't return
+    the expanded fields, the separate requests are sent instead.
+    """
+
+    # bug fields holding the inline data for the related request types
+    _inline_fields = {
+        'comments': 'comments',
+        'attachments': 'attachments',
+        'changes': 'history',
+    }
+
+    def __init__(self, ids, **kw):
+        super().__init__(ids=ids, **kw)
+        self._split_reqs = self._reqs
+        self._fields = tuple(
+            v for k, v in self._inline_fields.items() if getattr(self, f'_get_{k}'))
+        self._inline = bool(self._fields) and self.service._inline_get
+        self._fallback = False
+
+        if self._inline:
+            req = self.service.GetItemRequest(ids=ids, fields=('_default',) + self._fields)
+            if self._get_attachments:
+                # attachment data doesn't get pulled by default
+                req.params['exclude_fields'] = ['attachments.data']
+            self._reqs = (req,)
+
+    def parse(self, data):
+        if not self._inline:
+            yield from super().parse(data)
+            return
+
+        items = tuple(next(data))
+        if any(f not in item._data for item in items for f in self._fields):
+            # expansion unsupported, fallback to sending separate requests
+            self.service._inline_get = False
+            self._fallback = True
+            return
+
+        for item in items:
+            comments = item._data.pop('comments', None)
+            if comments is not None:
+                comments = tuple(
+                    BugzillaComment(comment=c, id=item.id, count=i)
+                    for i, c in enumerate(comments))
+            attachments = item._data.pop('attachments', None)
+            if attachments is not None:
+                attachments = tuple(self.service.attachment(**a) for a in attachments)
+            changes = item._data.pop('history', None)
+            if changes is not None:
+                alias = item._data.get('alias')
+                changes = tuple(
+                    BugzillaEvent(change=c, id=item.id, alias=alias, count=i)
+                    for i, c in enumerate(changes, start=1))
+            item.comments = comments
+            item.attachments = attachments
+            item.changes = changes
+            yield item
+
+    def followups(self, items):
+        return self._split_reqs if self._fallback else ()
+
+    def combine(self, items, data):
+        if self._fallback:
+            return super().parse(iter(data))
+        return items
+
+
 @req_cmd(Bugzilla5_0Rest)
 class _LoginRequest(LoginRequest, RESTRequest):
     """Construct a login request.
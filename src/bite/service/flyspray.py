@@ -74,7 +74,7 @@ class FlysprayTicket(Item):
 
 
 class FlysprayComment(Comment):
-    pass
+    __slots__ = ()
 
 
 class FlysprayAttachment(Attachment):
@@ -3,16 +3,23 @@
 API docs: https://developer.github.com/v3/
 """
 
-from dateutil.parser import parse as parsetime
-from snakeoil.klass import aliased, alias
+from datetime import datetime, timedelta
+from itertools import chain
 from urllib.parse import urlparse, urlunparse
+from warnings import warn
+
+from snakeoil.klass import aliased, alias
 
+from ._graphql import Graphql, GraphqlRequest, GraphqlPagedRequest
 from ._jsonrest import JsonREST
 from ..exceptions import RequestError, BiteError
-from ..objects import Item, Attachment, Comment, TimeInterval, IntRange
-from ._reqs import LinkHeaderPagedRequest, PagedRequest, QueryParseRequest, req_cmd
+from ..objects import Item, Attachment, Comment, Change, TimeInterval, IntRange, field_change
+from ._reqs import (
+    FollowupRequest, LinkHeaderPagedRequest, PagedRequest, QueryParseRequest,
+    ShardedRequest, Request, req_cmd)
 from ._rest import RESTRequest
 from ..utils import dict2tuples
+from ..utc import parse_timestamp as parsetime, utc, utcnow
 
 
 class GithubError(RequestError):
@@ -22,6 +29,28 @@ class GithubError(RequestError):
         super().__init__(msg, code, text)
 
 
+def _login(user):
+    return user['login'] if user else user
+
+
+def _parsetime(time):
+    return parsetime(time) if time else time
+
+
+def _project(url):
+    """Extract the organization and repo from a parsed github project URL."""
+    paths = url.path.strip('/').split('/')
+    try:
+        org, project = paths
+        return org, f'{org}/{project}'
+    except ValueError:
+        return (paths[0] if paths[0] else None), None
+
+
+# earliest creation time for github issues
+_EPOCH = datetime(2008, 1, 1, tzinfo=utc)
+
+
 class GithubIssue(Item):
 
     attributes = {
@@ -43,33 +72,37 @@ class GithubIssue(Item):
 
     type = 'issue'
 
-    def __init__(self, comments=None, attachments=None, **kw):
-        # TODO: map out which attrs to save instead of saving all
-        for k, v in kw.items():
-            if k == 'id':
-                continue
-            elif k == 'number':
-                k = 'id'
-            elif k == 'user':
-                v = v['login']
-            elif k in ('created_at', 'updated_at', 'closed_at') and v:
-                v = parsetime(v)
-            elif k == 'assignee' and v:
-                v = v['login']
-            setattr(self, k, v)
+    _converters = {
+        'user': _login,
+        'assignee': _login,
+        'created_at': _parsetime,
+        'updated_at': _parsetime,
+        'closed_at': _parsetime,
+    }
+
+    def __init__(self, comments=None, attachments=None, changes=None, **kw):
+        # use the repo specific issue number instead of the global ID
+        self.id = kw.get('number')
+        # remaining fields are decoded on access
+        self._data = kw
 
         self.attachments = attachments if attachments is not None else ()
         self.comments = comments if comments is not None else ()
+        self.changes = changes if changes is not None else ()
 
 
 class GithubComment(Comment):
-    pass
+    __slots__ = ()
 
 
 class GithubAttachment(Attachment):
     pass
 
 
+class GithubEvent(Change):
+    __slots__ = ()
+
+
 class GithubRest(JsonREST):
     """Service supporting the Github issue tracker via its v3 REST API."""
 
@@ -90,14 +123,7 @@ class GithubRest(JsonREST):
             '',
             None, None, None))
 
-        paths = url.path.strip('/').split('/')
-        try:
-            org, project = paths
-            self.repo = f'{org}/{project}'
-        except ValueError:
-            org = paths[0] if paths[0] else None
-            self.repo = None
-        self.org = org
+        self.org, self.repo = _project(url)
 
         # github maxes out at 100 results per page
         if max_results is None:
@@ -130,16 +156,97 @@ class GithubPagedRequest(PagedRequest, LinkHeaderPagedRequest, RESTRequest):
 
 
 @req_cmd(GithubRest, cmd='search')
-class _SearchRequest(QueryParseRequest, GithubPagedRequest):
+class _SearchRequest(ShardedRequest, QueryParseRequest, GithubPagedRequest):
     """Construct a search request.
 
+    Github only provides the first 1000 search results so queries sorted by
+    creation time that match more results are split into creation time
+    windows that are requested in parallel.
+
     Docs: https://developer.github.com/v3/search/#search-issues
         https://help.github.com/articles/searching-issues-and-pull-requests/
     """
 
+    # maximum number of results github returns for a search
+    _shard_cap = 1000
+
     def __init__(self, **kw):
         super().__init__(endpoint='/search/issues', **kw)
 
+    def _shardable(self):
+        return (
+            self.params.get('sort') == 'created' and
+            self.params.get('order') == 'asc' and
+            self._size_key not in self.params and
+            self.params[self._page_key] == self._start_page)
+
+    def _shard_params(self, shard):
+        """Return the query params restricted to a given creation time window."""
+        params = self.params.copy()
+        if shard is not None:
+            start, end = shard
+            query = self.param_parser.query.copy()
+            query['created'] = f'{start.isoformat()}..{end.isoformat()}'
+            params['q'] = self.param_parser._query_string(query)
+        return params
+
+    def _shard_window(self, shard):
+        """Return the creation time window covered by a shard."""
+        if shard is not None:
+            return shard
+        start, end = (
+            x.astimezone(utc) if x.tzinfo else x.replace(tzinfo=utc)
+            for x in self.param_parser.created_interval)
+        return start.replace(microsecond=0), end.replace(microsecond=0)
+
+    def _split_window(self, shard, total):
+        """Split a shard's time window, returning nothing for unsplittable windows."""
+        start, end = self._shard_window(shard)
+        step = (end - start) // -(-total // self._shard_cap)
+        step -= timedelta(microseconds=step.microseconds)
+        if step < timedelta(seconds=1):
+            return ()
+        windows = []
+        while start <= end:
+            windows.append((start, min(start + step, end)))
+            start += step + timedelta(seconds=1)
+        return tuple(windows)
+
+    def _shard_request(self, shard):
+        return self._copy(self._shard_params(shard))
+
+    def _shard_followups(self, shard, req, issues):
+        total = req._total
+        if total > self._shard_cap:
+            if self._split_window(shard, total):
+                return ()
+            # pull all issues from unsplittable windows
+            start, end = self._shard_window(shard)
+            warn(
+                f'search results truncated: {total} issues created between '
+                f'{start.isoformat()} and {end.isoformat()}, '
+                f'only the first {self._shard_cap} are retrievable')
+
+        # request all remaining pages in parallel
+        size = req.params[self._size_key]
+        pages = -(-min(total, self._shard_cap) // size)
+        reqs = []
+        for page in range(self._start_page + 1, self._start_page + pages):
+            params = self._shard_params(shard)
+            params[self._page_key] = page
+            reqs.append(self._copy(params))
+        return reqs
+
+    def _split_shard(self, shard, req, issues, data):
+        if req._total > self._shard_cap:
+            windows = self._split_window(shard, req._total)
+            if windows:
+                return (), windows
+        issues = list(issues)
+        for page in data:
+            issues.extend(page)
+        return issues, ()
+
     def parse(self, data):
         data = super().parse(data)
         issues = data['items']
@@ -157,6 +264,16 @@ class _SearchRequest(QueryParseRequest, GithubPagedRequest):
             'ALL': ('open', 'closed'),
         }
 
+        def __init__(self, **kw):
+            super().__init__(**kw)
+            # time window used for sharding queries matching too many results
+            self.created_interval = (_EPOCH, utcnow())
+
+        @staticmethod
+        def _query_string(query):
+            """Create a search query string from the given query terms."""
+            return ' '.join(f'{k}:{v}' if k else v for k, v in dict2tuples(query))
+
         def _finalize(self, **kw):
             if not self.query:
                 raise BiteError('no supported search terms or options specified')
@@ -179,8 +296,7 @@ class _SearchRequest(QueryParseRequest, GithubPagedRequest):
                 self.query.add('', terms)
 
             # create query string
-            self.params['q'] = ' '.join(
-                f'{k}:{v}' if k else v for k, v in dict2tuples(self.query))
+            self.params['q'] = self._query_string(self.query)
 
             # show issues in ascending order by default
             self.params.setdefault('sort', 'created')
@@ -253,6 +369,9 @@ class _SearchRequest(QueryParseRequest, GithubPagedRequest):
             if not isinstance(v, TimeInterval):
                 v = TimeInterval(v)
             start, end = v
+            if field == 'created':
+                self.created_interval = (
+                    start or self.created_interval[0], end or self.created_interval[1])
             if start and end:
                 self.query[field] = f'{start.isoformat()}..{end.isoformat()}'
             elif start:
@@ -344,3 +463,342 @@ class _PRSearchRequest(_SearchRequest):
                         f"(available: {', '.join(sorted(self._status_map))})")
                 self.query.add('status', value)
             self.options.append(f"{k.capitalize()}: {', '.join(v)}")
+
+
+# issue fields requested via GraphQL, nested connections are conditionally
+# included using the $comments and $events query variables
+_GRAPHQL_ISSUE = """
+fragment issueFields on Issue {
+  id
+  number
+  title
+  state
+  body
+  url
+  createdAt
+  updatedAt
+  closedAt
+  author { login }
+  assignees(first: 10) { nodes { login } }
+  labels(first: 100) { nodes { name } }
+  milestone { title }
+  comments(first: 100) @include(if: $comments) { ...commentsPage }
+  timelineItems(first: 100, itemTypes: [
+      LABELED_EVENT, UNLABELED_EVENT, ASSIGNED_EVENT, UNASSIGNED_EVENT,
+      CLOSED_EVENT, REOPENED_EVENT, RENAMED_TITLE_EVENT,
+      MILESTONED_EVENT, DEMILESTONED_EVENT]) @include(if: $events) {
+    ...eventsPage
+  }
+}
+"""
+
+_GRAPHQL_COMMENTS = """
+fragment commentsPage on IssueCommentConnection {
+  pageInfo { hasNextPage endCursor }
+  nodes { databaseId author { login } createdAt updatedAt body }
+}
+"""
+
+_GRAPHQL_EVENTS = """
+fragment eventsPage on IssueTimelineItemsConnection {
+  pageInfo { hasNextPage endCursor }
+  nodes {
+    __typename
+    ... on LabeledEvent { createdAt actor { login } label { name } }
+    ... on UnlabeledEvent { createdAt actor { login } label { name } }
+    ... on AssignedEvent { createdAt actor { login } assignee { ... on Actor { login } } }
+    ... on UnassignedEvent { createdAt actor { login } assignee { ... on Actor { login } } }
+    ... on ClosedEvent { createdAt actor { login } }
+    ... on ReopenedEvent { createdAt actor { login } }
+    ... on RenamedTitleEvent { createdAt actor { login } previousTitle currentTitle }
+    ... on MilestonedEvent { createdAt actor { login } milestoneTitle }
+    ... on DemilestonedEvent { createdAt actor { login } milestoneTitle }
+  }
+}
+"""
+
+_GRAPHQL_FRAGMENTS = _GRAPHQL_ISSUE + _GRAPHQL_COMMENTS + _GRAPHQL_EVENTS
+
+# map of timeline event types to their changed field and (removed, added) values
+_GRAPHQL_EVENT_CHANGES = {
+    'LabeledEvent': ('labels', lambda x: (None, x['label']['name'])),
+    'UnlabeledEvent': ('labels', lambda x: (x['label']['name'], None)),
+    'AssignedEvent': ('assignee', lambda x: (None, _login(x['assignee']))),
+    'UnassignedEvent': ('assignee', lambda x: (_login(x['assignee']), None)),
+    'ClosedEvent': ('state', lambda x: ('open', 'closed')),
+    'ReopenedEvent': ('state', lambda x: ('closed', 'open')),
+    'RenamedTitleEvent': ('title', lambda x: (x['previousTitle'], x['currentTitle'])),
+    'MilestonedEvent': ('milestone', lambda x: (None, x['milestoneTitle'])),
+    'DemilestonedEvent': ('milestone', lambda x: (x['milestoneTitle'], None)),
+}
+
+
+class GithubGraphql(Graphql):
+    """Service supporting the Github issue tracker via its v4 GraphQL API.
+
+    Issues are requested together with their comments and timeline events in
+    single queries instead of separate REST requests per issue.
+
+    API docs: https://developer.github.com/v4/
+    """
+
+    _service = 'github-graphql'
+    _service_error_cls = GithubError
+
+    item = GithubIssue
+    item_endpoint = '/issues/{id}'
+    attachment = GithubAttachment
+
+    def __init__(self, base, max_results=None, **kw):
+        # extract github project info
+        url = urlparse(base)
+        if url.netloc == 'github.com':
+            api_base = 'https://api.github.com'
+        else:
+            # github enterprise instances serve the API from the same host
+            api_base = urlunparse((url.scheme, url.netloc, '/api', None, None, None))
+
+        self.org, self.repo = _project(url)
+
+        # github maxes out at 100 nodes per connection page
+        if max_results is None:
+            max_results = 100
+
+        super().__init__(
+            base=api_base, endpoint='/graphql', max_results=max_results, **kw)
+        self.webbase = base
+
+    def inject_auth(self, request, params):
+        self.session.headers['Authorization'] = f'bearer {self.auth}'
+        self.authenticated = True
+        return request, params
+
+
+class _ConnectionRequest(FollowupRequest, GraphqlPagedRequest):
+    """Construct a request for the remaining pages of an issue's nested connection.
+
+    Each page is followed up by a request for the next one, if it exists.
+    """
+
+    _queries = {
+        'comments': """
+            query($id: ID!, $size: Int!, $cursor: String) {
+              node(id: $id) {
+                ... on Issue { comments(first: $size, after: $cursor) { ...commentsPage } }
+              }
+            }
+            """ + _GRAPHQL_COMMENTS,
+        'timelineItems': """
+            query($id: ID!, $size: Int!, $cursor: String) {
+              node(id: $id) {
+                ... on Issue { timelineItems(first: $size, after: $cursor) { ...eventsPage } }
+              }
+            }
+            """ + _GRAPHQL_EVENTS,
+    }
+
+    def __init__(self, *, id, field, cursor, **kw):
+        super().__init__(
+            query=self._queries[field], params={'id': id, 'cursor': cursor}, **kw)
+        self._id = id
+        self._field = field
+        self._connection = ('node', field)
+
+    def parse(self, data):
+        data = super().parse(data)
+        yield from data['nodes']
+
+    def followups(self, nodes):
+        if self._next_cursor is None:
+            return ()
+        return (_ConnectionRequest(
+            service=self.service, id=self._id, field=self._field, cursor=self._next_cursor),)
+
+    def combine(self, nodes, data):
+        return list(chain(nodes, *data))
+
+
+class _IssueNodesRequest(FollowupRequest):
+    """Create issues from parsed GraphQL issue nodes.
+
+    The remaining pages of the issues' nested connections are requested
+    concurrently before the issues are created.
+    """
+
+    # nested issue connections that can span multiple pages
+    _connections = ('comments', 'timelineItems')
+
+    def followups(self, nodes):
+        self._pages = []
+        reqs = []
+        for i, node in enumerate(nodes):
+            for field in self._connections:
+                connection = node.get(field)
+                if connection is not None and connection['pageInfo']['hasNextPage']:
+                    self._pages.append((i, field))
+                    reqs.append(_ConnectionRequest(
+                        service=self.service, id=node['id'], field=field,
+                        cursor=connection['pageInfo']['endCursor']))
+        return tuple(reqs)
+
+    def combine(self, nodes, data):
+        pages = dict(zip(self._pages, data))
+        for i, node in enumerate(nodes):
+            yield _graphql_issue(
+                node, comments=pages.get((i, 'comments'), ()),
+                events=pages.get((i, 'timelineItems'), ()))
+
+
+def _graphql_issue(node, comments=(), events=()):
+    """Create an issue from GraphQL data including its comments and changes.
+
+    The remaining nodes of the issue's comments and timeline events
+    connections are passed separately.
+    """
+    assignees = node['assignees']['nodes']
+    milestone = node['milestone']
+    # use REST API field names so issues from both services share converters
+    issue = GithubIssue(
+        number=node['number'], title=node['title'], state=node['state'].lower(),
+        body=node['body'], html_url=node['url'], user=node['author'],
+        assignee=assignees[0] if assignees else None, assignees=assignees,
+        labels=[x['name'] for x in node['labels']['nodes']],
+        milestone=milestone['title'] if milestone else None,
+        created_at=node['createdAt'], updated_at=node['updatedAt'],
+        closed_at=node['closedAt'])
+
+    if node.get('comments') is not None:
+        # the issue body is the initial comment
+        l = [GithubComment(
+            count=0, creator=_login(node['author']),
+            created=parsetime(node['createdAt']), text=node['body'])]
+        for i, c in enumerate(chain(node['comments']['nodes'], comments), start=1):
+            # don't count creation as a modification
+            updated = parsetime(c['updatedAt']) if c['updatedAt'] != c['createdAt'] else None
+            l.append(GithubComment(
+                id=c['databaseId'], count=i, creator=_login(c['author']),
+                created=parsetime(c['createdAt']), modified=updated, text=c['body']))
+        issue.comments = tuple(l)
+
+    if node.get('timelineItems') is not None:
+        l = []
+        for i, e in enumerate(chain(node['timelineItems']['nodes'], events), start=1):
+            field, values = _GRAPHQL_EVENT_CHANGES[e['__typename']]
+            l.append(GithubEvent(
+                count=i, creator=_login(e['actor']), created=parsetime(e['createdAt']),
+                changes=dict((field_change(field, *values(e)),))))
+        issue.changes = tuple(l)
+
+    return issue
+
+
+@req_cmd(GithubGraphql, name='SearchRequest', cmd='search')
+class _GraphqlSearchRequest(_IssueNodesRequest, QueryParseRequest, GraphqlPagedRequest):
+    """Construct a search request.
+
+    Docs: https://developer.github.com/v4/query/#search
+    """
+
+    _query = """
+        query($query: String!, $size: Int!, $cursor: String,
+              $comments: Boolean!, $events: Boolean!) {
+          search(query: $query, type: ISSUE, first: $size, after: $cursor) {
+            issueCount
+            pageInfo { hasNextPage endCursor }
+            nodes { ...issueFields }
+          }
+        }
+        """ + _GRAPHQL_FRAGMENTS
+
+    _total_key = 'issueCount'
+    _connection = ('search',)
+
+    ParamParser = _SearchRequest.ParamParser
+
+    def __init__(self, **kw):
+        super().__init__(query=self._query, **kw)
+
+        # convert search params into query variables, sorting is done via the query
+        query = self.params.pop('q')
+        sort = f"{self.params.pop('sort')}-{self.params.pop('order')}"
+        self.params = dict(self.params)
+        self.params.update({
+            'query': f'{query} type:issue sort:{sort}',
+            'comments': self.unused_params.get('get_comments', True),
+            'events': self.unused_params.get('get_changes', True),
+        })
+
+    def parse(self, data):
+        data = super().parse(data)
+        for node in data['nodes']:
+            # skip pull requests which don't match the requested issue fields
+            if node:
+                yield node
+
+
+class _IssuesRequest(GraphqlRequest):
+    """Construct a request for a batch of aliased issue lookups.
+
+    Errors for separate lookups, e.g. nonexistent issues, are returned with
+    the data so they can be reported per issue.
+    """
+
+    def parse_response(self, response):
+        return self.service.parse_response(response, partial=True)
+
+
+@req_cmd(GithubGraphql, name='GetRequest', cmd='get')
+class _GraphqlGetRequest(_IssueNodesRequest, Request):
+    """Construct a get request.
+
+    Issues are requested in batches of aliased lookups, with batches being
+    requested in parallel.
+    """
+
+    _query = """
+        query($owner: String!, $name: String!, $comments: Boolean!, $events: Boolean!) {
+          repository(owner: $owner, name: $name) {
+            %s
+          }
+        }
+        """ + _GRAPHQL_FRAGMENTS
+
+    # number of issues requested per query
+    _batch_size = 20
+
+    def __init__(self, ids, get_comments=True, get_attachments=True, get_changes=False, **kw):
+        super().__init__(**kw)
+        if not ids:
+            raise ValueError(f'No {self.service.item.type} ID(s) specified')
+        if self.service.repo is None:
+            raise BiteError('retrieving issues requires a repo')
+
+        owner, name = self.service.repo.split('/')
+        params = {'owner': owner, 'name': name, 'comments': get_comments, 'events': get_changes}
+        reqs = []
+        for i in range(0, len(ids), self._batch_size):
+            lookups = '\n'.join(
+                f'i{x}: issue(number: {x}) {{ ...issueFields }}'
+                for x in map(int, ids[i:i + self._batch_size]))
+            reqs.append(_IssuesRequest(
+                service=self.service, query=self._query % lookups, params=params.copy()))
+        self._reqs = tuple(reqs)
+
+    def parse(self, data):
+        self._failed = []
+        for batch, errors in data:
+            repo = batch['repository']
+            if repo is None:
+                msg = errors.get(('repository',), 'unknown repository')
+                self.service.handle_error(code=None, msg=msg)
+            for alias, node in repo.items():
+                error = errors.get(('repository', alias))
+                if error is not None:
+                    self._failed.append(f'#{alias[1:]}: {error}')
+                elif node is not None:
+                    yield node
+
+    def combine(self, nodes, data):
+        yield from super().combine(nodes, data)
+        if self._failed:
+            self.service.handle_error(code=None, msg=', '.join(self._failed))
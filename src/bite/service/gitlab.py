@@ -3,13 +3,13 @@
 API docs: https://docs.gitlab.com/ee/api/
 """
 
-from dateutil.parser import parse as parsetime
 from snakeoil.klass import aliased, alias
 from urllib.parse import urlparse, urlunparse, quote_plus
 
 from ._jsonrest import JsonREST
 from ..exceptions import RequestError, BiteError
 from ..objects import Item, Attachment, Comment, TimeInterval
+from ..utc import parse_timestamp as parsetime
 from ._reqs import LinkHeaderPagedRequest, PagedRequest, ParseRequest, req_cmd
 from ._rest import RESTRequest
 
@@ -21,6 +21,14 @@ class GitlabError(RequestError):
         super().__init__(msg, code, text)
 
 
+def _username(user):
+    return user['username'] if user else user
+
+
+def _parsetime(time):
+    return parsetime(time) if time else time
+
+
 class GitlabIssue(Item):
 
     attributes = {
@@ -42,30 +50,31 @@ class GitlabIssue(Item):
 
     type = 'issue'
 
+    _converters = {
+        'author': _username,
+        'assignee': _username,
+        'created_at': _parsetime,
+        'updated_at': _parsetime,
+        'closed_at': _parsetime,
+    }
+
     def __init__(self, repo=None, comments=None, attachments=None, **kw):
-        for k, v in kw.items():
-            # Prefix project ID to issue iid depending on the connection type.
-            # The 'id' field unique across all issues is essentially useless
-            # for us since most API calls only use project IDs and iids.
-            # https://docs.gitlab.com/ee/api/README.html#id-vs-iid
-            if k == 'id':
-                continue
-            elif k == 'iid':
-                k = 'id'
-                if repo is None:
-                    v = f"{kw['project_id']}-{v}"
-            elif k in ('created_at', 'updated_at', 'closed_at') and v:
-                v = parsetime(v)
-            elif k in ('author', 'assignee') and v:
-                v = v['username']
-            setattr(self, k, v)
+        # Prefix project ID to issue iid depending on the connection type.
+        # The 'id' field unique across all issues is essentially useless
+        # for us since most API calls only use project IDs and iids.
+        # https://docs.gitlab.com/ee/api/README.html#id-vs-iid
+        self.id = kw.get('iid')
+        if repo is None and self.id is not None:
+            self.id = f"{kw['project_id']}-{self.id}"
+        # remaining fields are decoded on access
+        self._data = kw
 
         self.attachments = attachments if attachments is not None else ()
         self.comments = comments if comments is not None else ()
 
 
 class GitlabComment(Comment):
-    pass
+    __slots__ = ()
 
 
 class GitlabAttachment(Attachment):
@@ -157,6 +166,28 @@ class GitlabPagedRequest(PagedRequest, LinkHeaderPagedRequest, RESTRequest):
     # gitlab defaults to starting at page 1
     _start_page = 1
 
+    # Field to order results by for keyset pagination. Deep offset pages are
+    # slow and capped for large projects so requests supporting keyset
+    # pagination follow the returned link headers instead.
+    # Docs: https://docs.gitlab.com/ee/api/rest/index.html#keyset-based-pagination
+    _keyset_order = None
+
+    def __init__(self, page=None, **kw):
+        super().__init__(page=page, **kw)
+        # explicitly requested pages require offset pagination
+        self._keyset = page is None
+
+    def send(self):
+        if self._keyset and self._keyset_order is not None:
+            self.params.pop(self._page_key, None)
+            self.params['pagination'] = 'keyset'
+            self.params['order_by'] = self._keyset_order
+            # result totals aren't returned for keyset pagination
+            self._total_key = None
+            self._prefetch = True
+            self._finalized = False
+        yield from super().send()
+
 
 # TODO: Add more specific Elasticsearch functionality to another search req
 # class, especially since gitlab.com doesn't support elasticsearch queries yet
@@ -183,6 +214,11 @@ class _SearchRequest(ParseRequest, GitlabPagedRequest):
         self._repo = kw['service'].repo
         super().__init__(endpoint=self.endpoint, **kw)
 
+    @property
+    def _keyset_order(self):
+        # keyset pagination is only supported for project issues
+        return 'created_at' if self._repo is not None else None
+
     def parse(self, data):
         issues = super().parse(data)
         for issue in issues:
@@ -288,6 +324,11 @@ class _ProjectSearchRequest(ParseRequest, GitlabPagedRequest):
             self.endpoint = '/projects'
         super().__init__(endpoint=self.endpoint, **kw)
 
+    @property
+    def _keyset_order(self):
+        # keyset pagination isn't supported for group projects
+        return 'id' if self.service.group is None else None
+
     def parse(self, data):
         projects = list(super().parse(data))
         for project in projects:
@@ -5,19 +5,20 @@ API docs:
     - https://docs.atlassian.com/jira/REST/server/
 """
 
+from itertools import chain, islice
 import re
 
-from dateutil.parser import parse as parsetime
 from snakeoil.klass import aliased, alias
 
 from ._jsonrest import JsonREST
 from ._reqs import (
     OffsetPagedRequest, req_cmd, BaseCommentsRequest, BaseChangesRequest,
-    NullRequest, Request, QueryParseRequest,
+    FollowupRequest, NullRequest, Request, QueryParseRequest,
 )
 from ._rest import RESTRequest
 from ..exceptions import BiteError, RequestError
 from ..objects import Item, Comment, Change, Attachment, TimeInterval, IntRange
+from ..utc import parse_timestamp as parsetime
 
 
 class JiraError(RequestError):
@@ -60,7 +61,6 @@ class JiraIssue(Item):
     type = 'issue'
 
     def __init__(self, get_comments=False, get_attachments=False, get_changes=False, **kw):
-        # TODO: add support for parsing changes
         self.changes = None
         self.attachments = None
         self.comments = None
@@ -80,6 +80,9 @@ class JiraIssue(Item):
             elif k == 'comment' and get_comments:
                 k = 'comments'
                 v = JiraComment.parse(v['comments'])
+            elif k == 'changelog' and get_changes:
+                k = 'changes'
+                v = JiraEvent.parse(v)
             setattr(self, k, v)
 
         if get_comments:
@@ -94,6 +97,8 @@ class JiraIssue(Item):
 
 class JiraComment(Comment):
 
+    __slots__ = ()
+
     @classmethod
     def parse(cls, data):
         l = []
@@ -111,19 +116,34 @@ class JiraComment(Comment):
 class JiraAttachment(Attachment):
 
     @classmethod
-    def parse(cls, data):
+    def parse(cls, data, content=None):
         l = []
-        for a in data:
+        content = content if content is not None else (None for _ in data)
+        for a, c in zip(data, content):
             l.append(cls(
                 id=a['id'], creator=a['author']['name'],
                 created=parsetime(a['created']), size=a['size'],
                 filename=a['filename'], mimetype=a['mimeType'],
-                url=a['content']))
+                url=a['content'], data=c))
         return tuple(l)
 
 
 class JiraEvent(Change):
-    pass
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, data):
+        l = []
+        for i, h in enumerate(data, start=1):
+            # automated changes lack authors
+            author = h.get('author')
+            changes = {
+                x['field']: (x['fromString'], x['toString']) for x in h['items']}
+            l.append(cls(
+                id=h['id'], count=i, creator=author['name'] if author else None,
+                created=parsetime(h['created']), changes=changes))
+        return tuple(l)
 
 
 class Jira(JsonREST):
@@ -192,6 +212,8 @@ class JiraPagedRequest(OffsetPagedRequest, RESTRequest):
     _offset_key = 'startAt'
     _size_key = 'maxResults'
     _total_key = 'total'
+    # jira returns the total number of results without any issues
+    _count_size = 0
 
 
 @req_cmd(Jira, cmd='search')
@@ -322,53 +344,142 @@ class _SearchRequest(QueryParseRequest, JiraPagedRequest):
             self.options.append(f"{k.capitalize()}: {v} {k}")
 
 
+def _issue_key(service, id):
+    """Convert an issue ID to its project based key."""
+    if re.match(r'\d+', id) and service.project:
+        return f'{service.project}-{id}'
+    return id
+
+
+class _ChangelogRequest(FollowupRequest, RESTRequest):
+    """Construct a request for the changelog entries of an issue.
+
+    After the initial page is parsed, the remaining entries up to the given
+    end are requested concurrently in pages of the size the service
+    returned. Pages falling short request their missing entries in turn.
+    """
+
+    # max number of changelog entries requested per page
+    _size = 100
+
+    def __init__(self, *, key, start=0, end=None, **kw):
+        endpoint = f'{kw["service"]._base}/issue/{key}/changelog'
+        params = {'startAt': start, 'maxResults': self._size}
+        super().__init__(endpoint=endpoint, params=params, **kw)
+        self._key = key
+        self._start = start
+        self._end = end
+
+    def parse(self, data):
+        if self._end is None:
+            self._end = data['total']
+        yield from data['values']
+
+    def followups(self, entries):
+        size = len(entries)
+        if not size:
+            # services can return empty pages before the expected total
+            return ()
+        return tuple(
+            _ChangelogRequest(
+                service=self.service, key=self._key,
+                start=start, end=min(start + size, self._end))
+            for start in range(self._start + size, self._end, size))
+
+    def combine(self, entries, data):
+        return list(chain(entries, *data))
+
+
 @req_cmd(Jira, cmd='get')
-class _GetRequest(Request):
-    """Construct an issue request."""
+class _GetRequest(FollowupRequest, Request):
+    """Construct an issue request.
+
+    Issues are pulled in chunks via concurrent search requests that only
+    retrieve the fields required to render them.
+    """
+
+    # max number of issues requested per search
+    _chunk_size = 50
+
+    # map of item attributes to their related jira fields
+    _fields_map = {
+        'id': None,
+        'comments': None,
+        'attachments': None,
+        'changes': None,
+    }
 
     def __init__(self, ids, get_comments=True, get_attachments=True,
-                 get_changes=False, **kw):
+                 get_changes=False, fields=None, **kw):
         super().__init__(**kw)
         if ids is None:
             raise ValueError(f'No {self.service.item.type} specified')
 
-        self._get_comments = get_comments
-        self._get_attachments = get_attachments
-        self._get_changes = get_changes
         self.ids = list(map(str, ids))
         self.options.append(f"IDs: {', '.join(self.ids)}")
 
-        # enable/disable field retrieval and expansion based on requested fields
-        self.item_params = {}
-        params = {}
-        expand = []
-        fields = ['*all']
-        for attr, field in (('get_comments', 'comment'),
-                            ('get_changes', 'changelog'),
-                            ('get_attachments', 'attachment')):
-            enabled = getattr(self, f'_{attr}')
-            self.item_params[attr] = enabled
-            if enabled:
-                expand.append(field)
-            else:
-                fields.append(f'-{field}')
-
-        params['expand'] = expand
-        params['fields'] = fields
+        if fields is None:
+            # pull the fields shown when rendering items by default
+            fields = [x for x, _title in self.service.item._print_fields]
+        else:
+            # only pull requested comments, attachments, and changes
+            get_comments = get_comments and 'comments' in fields
+            get_attachments = get_attachments and 'attachments' in fields
+            get_changes = get_changes and 'changes' in fields
+            aliases = self.service.item.attribute_aliases
+            fields = [aliases.get(x, x) for x in fields]
 
-        reqs = []
-        for i in self.ids:
-            if re.match(r'\d+', i) and self.service.project:
-                id_key = f'{self.service.project}-{i}'
-            else:
-                id_key = i
-            endpoint = f'{self.service._base}/issue/{id_key}'
-            reqs.append(RESTRequest(service=self.service, endpoint=endpoint, params=params))
-        self._reqs = tuple(reqs)
+        # enable/disable field retrieval and expansion based on requested fields
+        self.item_params = {
+            'get_comments': get_comments,
+            'get_attachments': get_attachments,
+            'get_changes': get_changes,
+        }
+        search_fields = []
+        for field in fields:
+            field = self._fields_map.get(field, field)
+            if field is not None and field not in search_fields:
+                search_fields.append(field)
+        if get_comments:
+            # the description is rendered as the initial comment
+            search_fields.extend(('comment', 'description'))
+            if 'creator' not in search_fields:
+                search_fields.append('creator')
+        if get_attachments:
+            search_fields.append('attachment')
+        expand = ['changelog'] if get_changes else []
+
+        id_keys = [_issue_key(self.service, i) for i in self.ids]
+        self._chunks = [
+            id_keys[i:i + self._chunk_size]
+            for i in range(0, len(id_keys), self._chunk_size)]
+        self._reqs = tuple(
+            _SearchGetItemRequest(
+                service=self.service, ids=chunk, fields=search_fields, expand=expand)
+            for chunk in self._chunks)
 
     def parse(self, data):
         data = super().parse(data)
-        for issue in data:
+        for id_keys, chunk in zip(self._chunks, data):
+            issues = {x['key'].upper(): x for x in chunk}
+            for key in id_keys:
+                issue = issues.get(key.upper())
+                if issue is None:
+                    self.service.handle_error(code=404, msg=f'Issue Does Not Exist: {key}')
+                yield issue
+
+    def followups(self, issues):
+        # Pull complete changelogs for issues with truncated inline
+        # changelogs, these aren't guaranteed to start at the first entry.
+        self._truncated = [
+            x['key'] for x in issues if 'changelog' in x and
+            len(x['changelog']['histories']) < x['changelog']['total']]
+        return tuple(
+            _ChangelogRequest(service=self.service, key=key) for key in self._truncated)
+
+    def combine(self, issues, data):
+        changelogs = dict(zip(self._truncated, data))
+        for issue in issues:
             # Use project ID key for issue id, the regular id field relates to
             # the global issue ID across all projects on the service instance.
             # Using the key value matches what is shown on the web interface.
@@ -377,44 +488,43 @@ class _GetRequest(Request):
                 # if configured for a specific project, strip it from the ID
                 id = id[len(self.service.project) + 1:]
             fields = issue.get('fields', {})
+            if 'changelog' in issue:
+                fields['changelog'] = changelogs.get(
+                    issue['key'], issue['changelog']['histories'])
             yield self.service.item(id=id, **self.item_params, **fields)
 
 
 class _SearchGetItemRequest(_SearchRequest):
     """Construct an issue request using a search request.
 
-    Note that the returned items are not in the same order the specified IDs
+    Note that the returned issues are not in the same order the specified IDs
     are in and Jira currently doesn't seem to support ordering them in that fashion.
     """
 
-    def __init__(self, ids, **kw):
+    def __init__(self, ids, fields, expand=(), **kw):
         if ids is None:
-            raise ValueError(f'No {self.service.item.type} specified')
-
-        super().__init__(id=ids, **kw)
+            raise ValueError(f"No {kw['service'].item.type} specified")
 
-        self.options.append(f"IDs: {', '.join(map(str, ids))}")
+        self._fields = list(fields)
+        self._expand = list(expand)
+        super().__init__(id=ids, limit=len(ids), **kw)
         self.ids = list(map(str, ids))
 
     class ParamParser(_SearchRequest.ParamParser):
 
         def _finalize(self, **kw):
-            expand = []
-            fields = ['*all']
-
-            # enable/disable field retrieval and expansion based on requested fields
-            for attr, field in (('comments', 'comment'),
-                                ('changes', 'changelog'),
-                                ('attachments', 'attachment')):
-                if getattr(self.request, f'_get_{attr}'):
-                    expand.append(field)
-                else:
-                    fields.append(f'-{field}')
-
-            self.params['expand'] = expand
-            self.params['fields'] = fields
+            self.params['fields'] = self.request._fields
+            if self.request._expand:
+                self.params['expand'] = self.request._expand
+            # skip nonexistent issues instead of failing the entire query
+            self.params['validateQuery'] = False
             super()._finalize(**kw)
 
+    def parse(self, data):
+        # skip item creation, raw issues are matched to their requested IDs
+        data = super(_SearchRequest, self).parse(data)
+        return data['issues']
+
 
 @req_cmd(Jira, cmd='comments')
 class _CommentsRequest(BaseCommentsRequest):
@@ -423,17 +533,13 @@ class _CommentsRequest(BaseCommentsRequest):
     def __init__(self, **kw):
         super().__init__(**kw)
 
-        if self.ids is None:
+        if not self.ids:
             raise ValueError(f'No {self.service.item.type} ID(s) specified')
         self.options.append(f"IDs: {', '.join(self.ids)}")
 
         reqs = []
         for i in self.ids:
-            if re.match(r'\d+', i) and self.service.project:
-                id_key = f'{self.service.project}-{i}'
-            else:
-                id_key = i
-            endpoint = f'{self.service._base}/issue/{id_key}/comment'
+            endpoint = f'{self.service._base}/issue/{_issue_key(self.service, i)}/comment'
             reqs.append(JiraPagedRequest(service=self.service, endpoint=endpoint))
         self._reqs = tuple(reqs)
 
@@ -445,37 +551,86 @@ class _CommentsRequest(BaseCommentsRequest):
 
 
 @req_cmd(Jira, cmd='attachments')
-class _AttachmentsRequest(Request):
-    """Construct an attachments request."""
+class _AttachmentsRequest(FollowupRequest, Request):
+    """Construct an attachments request.
+
+    Attachment metadata is pulled concurrently for all specified issues or
+    attachments, afterwards the attachment content is downloaded in parallel.
+    """
 
-    def __init__(self, ids=None, item_id=False, data=None, **kw):
+    # attachment content is served via redirects
+    _followup_kw = {'allow_redirects': True}
+
+    def __init__(self, ids=None, attachment_ids=None, get_data=False, data=None, **kw):
         super().__init__(**kw)
-        if ids is None:
+        if not any((ids, attachment_ids)):
             raise ValueError(f'No ID(s) specified')
 
-        if data is None:
-            # TODO
-            pass
-        else:
+        if data is not None:
             reqs = [NullRequest()]
+        elif ids:
+            reqs = [
+                RESTRequest(
+                    service=self.service, params={'fields': 'attachment'},
+                    endpoint=f'/issue/{_issue_key(self.service, str(i))}')
+                for i in ids]
+        else:
+            reqs = [
+                RESTRequest(service=self.service, endpoint=f'/attachment/{i}')
+                for i in attachment_ids]
 
         self.ids = ids
+        self.attachment_ids = attachment_ids
+        self._get_data = get_data
         self._reqs = tuple(reqs)
         self._data = data
 
     def parse(self, data):
         if self._data is not None:
-            for attachments in self._data:
-                yield JiraAttachment.parse(attachments)
+            yield from self._data
+        elif self.ids:
+            for x in data:
+                yield x['fields']['attachment']
         else:
-            # TODO
-            pass
+            # group all requested attachments together
+            yield list(data)
+
+    def followups(self, attachments):
+        if not self._get_data or self._data is not None:
+            return ()
+        reqs = [
+            RESTRequest(service=self.service, endpoint=a['content'], raw=True)
+            for a in chain.from_iterable(attachments)]
+        return (Request(service=self.service, reqs=reqs, raw=True),) if reqs else ()
+
+    def combine(self, attachments, data):
+        content = iter(data[0]) if data else None
+        for x in attachments:
+            yield JiraAttachment.parse(
+                x, content=islice(content, len(x)) if content is not None else None)
 
 
 @req_cmd(Jira, cmd='changes')
 class _ChangesRequest(BaseChangesRequest):
-    """Construct a comments request."""
+    """Construct a changes request.
+
+    The first changelog page for each issue is requested concurrently,
+    afterwards the remaining pages are requested concurrently as well.
+    """
 
+    def __init__(self, **kw):
+        super().__init__(**kw)
+
+        if not self.ids:
+            raise ValueError(f'No {self.service.item.type} ID(s) specified')
+        self.options.append(f"IDs: {', '.join(self.ids)}")
+
+        self._reqs = tuple(
+            _ChangelogRequest(service=self.service, key=_issue_key(self.service, i))
+            for i in self.ids)
+
+    def parse(self, data):
+        yield from self.filter(JiraEvent.parse(entries) for entries in data)
 
 
 @req_cmd(Jira, cmd='version')
@@ -5,18 +5,18 @@ API docs:
     https://help.launchpad.net/API/Hacking
 """
 
-from dateutil.parser import parse as dateparse
 from snakeoil.klass import aliased, alias
 
 from ._jsonrest import JsonREST
 from ._reqs import (
-    OffsetPagedRequest, Request, BaseGetRequest, req_cmd,
+    FollowupRequest, OffsetPagedRequest, Request, BaseGetRequest, req_cmd,
     URLParseRequest, BaseCommentsRequest,
 )
 from ._rest import RESTRequest
 from ..cache import Cache
 from ..exceptions import RequestError, BiteError
 from ..objects import Item, Attachment, Comment, Change, TimeInterval
+from ..utc import parse_timestamp as dateparse
 
 
 class LaunchpadError(RequestError):
@@ -72,7 +72,7 @@ class LaunchpadBug(Item):
 
 
 class LaunchpadComment(Comment):
-    pass
+    __slots__ = ()
 
 
 class LaunchpadAttachment(Attachment):
@@ -84,7 +84,7 @@ class LaunchpadAttachment(Attachment):
 
 
 class LaunchpadEvent(Change):
-    pass
+    __slots__ = ()
 
 
 # TODO: cache project milestones
@@ -146,6 +146,15 @@ class _SearchRequest(URLParseRequest, LaunchpadPagedRequest):
             raise LaunchpadError(msg=e.text, code=e.code)
         raise e
 
+    def _count_params(self):
+        # launchpad directly returns the total number of matching bugs
+        params = self.params.copy()
+        params['ws.show'] = 'total_size'
+        return params
+
+    def parse_count(self, response):
+        return self.service.parse_response(response)
+
     @aliased
     class ParamParser(URLParseRequest.ParamParser):
 
@@ -384,9 +393,12 @@ class _CommentsRequest(BaseCommentsRequest):
 
 
 @req_cmd(Launchpad, cmd='attachments')
-class _AttachmentsRequest(Request):
+class _AttachmentsRequest(FollowupRequest, Request):
     """Construct an attachments request."""
 
+    # attachment content is served via redirects
+    _followup_kw = {'allow_redirects': True}
+
     def __init__(self, ids=(), attachment_ids=(), get_data=False, **kw):
         super().__init__(**kw)
         if not any((ids, attachment_ids)):
@@ -414,12 +426,23 @@ class _AttachmentsRequest(Request):
         for attachments in data:
             if self.ids:
                 attachments = attachments['entries']
-            if self._get_data:
-                reqs = tuple(Request(
-                    service=self.service, method='GET', url=x['data_link'], raw=True)
-                    for x in attachments)
-                content = Request(
-                    service=self.service, reqs=reqs, raw=True).send(allow_redirects=True)
+            yield attachments
+
+    def followups(self, items):
+        if not self._get_data:
+            return ()
+        # request attachment content for all items in parallel
+        return tuple(
+            Request(service=self.service, raw=True, reqs=tuple(
+                Request(service=self.service, method='GET', url=x['data_link'], raw=True)
+                for x in attachments))
+            for attachments in items if attachments)
+
+    def combine(self, items, data):
+        data = iter(data)
+        for attachments in items:
+            if self._get_data and attachments:
+                content = next(data)
             else:
                 content = self._none_gen
             yield tuple(self.service.attachment(data=c, **a)
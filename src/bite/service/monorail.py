@@ -118,6 +118,9 @@ class GooglecodeIssue(Item):
 
 
 class GooglecodeComment(Comment):
+
+    __slots__ = ()
+
     def __init__(self, id=None, creator=None, created=None, count=None, changes=None, text=None, **kw):
         if not text:
             text = '(No comment was entered for this change)'
@@ -6,16 +6,16 @@ API docs:
 
 from itertools import chain
 
-from dateutil.parser import parse as dateparse
 from snakeoil.klass import aliased, alias
 
 from .._reqs import (
-    OffsetPagedRequest, Request, req_cmd,
+    FollowupRequest, OffsetPagedRequest, Request, req_cmd,
     BaseCommentsRequest, QueryParseRequest,
 )
 from .._rest import REST, RESTRequest
 from ...exceptions import BiteError, RequestError
 from ...objects import Item, Comment, Attachment, Change, TimeInterval
+from ...utc import parse_timestamp as dateparse
 
 
 class RedmineError(RequestError):
@@ -85,7 +85,7 @@ class RedmineIssue(Item):
 
 
 class RedmineComment(Comment):
-    pass
+    __slots__ = ()
 
 
 class RedmineAttachment(Attachment):
@@ -93,7 +93,7 @@ class RedmineAttachment(Attachment):
 
 
 class RedmineEvent(Change):
-    pass
+    __slots__ = ()
 
 
 class Redmine(REST):
@@ -382,7 +382,7 @@ class _CommentsRequest(BaseCommentsRequest):
 
 
 @req_cmd(Redmine, cmd='get')
-class _GetRequest(_GetItemRequest):
+class _GetRequest(FollowupRequest, _GetItemRequest):
     """Construct requests to retrieve all known data for given issue IDs."""
 
     def __init__(self, ids, get_comments=True, get_attachments=True, get_changes=False, **kw):
@@ -394,20 +394,20 @@ class _GetRequest(_GetItemRequest):
         self._get_attachments = get_attachments
         self._get_changes = get_changes
 
-    def parse(self, data):
-        items = list(super().parse(data))
-        return self.yield_items(items)
+    def followups(self, items):
+        if self._get_comments:
+            return (self.service.CommentsRequest(ids=self.ids),)
+        return ()
 
-    def yield_items(self, items):
+    def combine(self, items, data):
         comments = self._none_gen
         attachments = self._none_gen
         changes = self._none_gen
 
-        if any((self._get_comments, self._get_attachments, self._get_changes)):
-            if self._get_comments:
-                item_descs = ((x.description,) if getattr(x, 'description', False) else () for x in items)
-                item_comments = self.service.CommentsRequest(ids=self.ids).send()
-                comments = (x + y for x, y in zip(item_descs, item_comments))
+        if self._get_comments:
+            item_comments, = data
+            item_descs = ((x.description,) if getattr(x, 'description', False) else () for x in items)
+            comments = (x + y for x, y in zip(item_descs, item_comments))
 
         for item in items:
             item.comments = next(comments)
@@ -432,10 +432,8 @@ class _3_2GetRequest(_3_2GetItemRequest, _GetRequest):
         self._req = None
 
     def parse(self, data):
-        items = list(
-            self.service.item(self.service, get_desc=self._get_desc, **x['issue'])
-            for x in data)
-        return self.yield_items(items)
+        for x in data:
+            yield self.service.item(self.service, get_desc=self._get_desc, **x['issue'])
 
 
 @req_cmd(Redmine3_2, name='SearchRequest', cmd='search')
@@ -454,23 +452,29 @@ class _BaseSearchRequest(QueryParseRequest, RedminePagedRequest):
     def __init__(self, *, service, **kw):
         self._itemreq_extra_params = {}
         super().__init__(service=service, endpoint=f'/search.{service._ext}', **kw)
-        self._itemreq = self.service.GetItemRequest(searchreq=True, **self.unused_params)
+        self._itemreq_params = dict(self.unused_params)
+        self._itemreq = self.service.GetItemRequest(searchreq=True, **self._itemreq_params)
         self.options.extend(self._itemreq.options)
 
     def send(self):
         # only send search req if it actually has query params
-        if self.params:
-            issues = list(super().send())
-        else:
-            issues = []
-
-        # query and pull additional issue fields not available via search
-        if issues or self._itemreq.params:
-            if issues:
-                self._itemreq_extra_params['ids'] = issues
-            self._itemreq.parse_params(**self._itemreq_extra_params)
-            issues = self._itemreq.send()
-        yield from issues
+        if not self.params:
+            if self._itemreq.params:
+                self._itemreq.parse_params(**self._itemreq_extra_params)
+                yield from self._itemreq.send()
+            return
+
+        # query and pull additional issue fields not available via search,
+        # requesting them as search result pages arrive
+        yield from self.service.pipeline(
+            super().send(), self._itemreq_chunk,
+            size=min(self.service.max_results, 100))
+
+    def _itemreq_chunk(self, ids):
+        """Create an item request for a chunk of search result IDs."""
+        req = self.service.GetItemRequest(searchreq=True, **self._itemreq_params)
+        req.parse_params(ids=ids, **self._itemreq_extra_params)
+        return req
 
     def parse(self, data):
         # parse the search query results if a query exists
@@ -10,14 +10,18 @@ from itertools import chain, islice
 import re
 
 from datetime import datetime
+from lxml import etree
 from snakeoil.klass import aliased, alias
 
-from ._reqs import NullRequest, ParseRequest, req_cmd, BaseCommentsRequest
+from ._html import HTMLRequest
+from ._reqs import (
+    FollowupRequest, NullRequest, ParseRequest, Request, req_cmd,
+    BaseChangesRequest, BaseCommentsRequest)
 from ._rpc import Multicall, RPCRequest
 from ._xmlrpc import Xmlrpc
-from ..cache import Cache, csv2tuple
+from ..cache import Cache
 from ..exceptions import RequestError, BiteError
-from ..objects import Item, Attachment, Comment, TimeInterval
+from ..objects import Item, Attachment, Comment, Change, TimeInterval
 from ..utc import utc
 
 
@@ -96,72 +100,155 @@ class RoundupIssue(Item):
 
     type = 'issue'
 
+    # map of fields to the cached classes their IDs index into
+    _cached_fields = {
+        'assignee': 'user',
+        'creator': 'user',
+        'actor': 'user',
+        'nosy': 'user',
+        'status': 'status',
+        'priority': 'priority',
+        'keywords': 'keyword',
+    }
+
     def __init__(self, service, **kw):
         self.service = service
-        for k, v in kw.items():
-            if k in ('creation', 'activity'):
-                setattr(self, k, parsetime(v))
-            elif k in ('creator', 'actor'):
-                try:
-                    username = self.service.cache['users'][int(v)-1]
-                except IndexError:
-                    # cache needs update
-                    username = v
-                setattr(self, k, username)
-            elif k == 'status':
-                try:
-                    status = self.service.cache['status'][int(v)-1]
-                except IndexError:
-                    # cache needs update
-                    status = v
-                setattr(self, k, status)
-            elif k == 'priority' and v is not None:
-                try:
-                    priority = self.service.cache['priority'][int(v)-1]
-                except IndexError:
-                    # cache needs update
-                    priority = v
-                setattr(self, k, priority)
-            elif k == 'keyword' and v is not None:
-                keywords = []
-                for keyword in v:
-                    try:
-                        keywords.append(self.service.cache['keyword'][int(keyword)-1])
-                    except IndexError:
-                        # cache needs update
-                        keywords.append(keyword)
-                setattr(self, k, keywords)
-            else:
-                setattr(self, k, v)
+        # fields are decoded on access
+        self._data = kw
+
+    def _lookup(self, cls, value):
+        """Convert an ID to its related name using cached values."""
+        name = self.service.cache.name(cls, value)
+        # cache needs update
+        if name is None:
+            return value
+        return name
+
+    def _decode_field(self, name, value):
+        if name in ('creation', 'activity'):
+            return parsetime(value)
+        elif value is None:
+            return value
+        elif name in self._cached_fields:
+            cls = self._cached_fields[name]
+            if isinstance(value, list):
+                return [self._lookup(cls, x) for x in value]
+            return self._lookup(cls, value)
+        return value
 
 
 class RoundupComment(Comment):
-    pass
+    __slots__ = ()
 
 
 class RoundupAttachment(Attachment):
     pass
 
 
+class RoundupEvent(Change):
+
+    __slots__ = ()
+
+    @staticmethod
+    def _multilink(value):
+        """Convert a rendered multilink change into removed and added values."""
+        # e.g. "+ msg1, msg2, - msg3"
+        added, removed = [], []
+        values = added
+        for x in value.split(', '):
+            if x.startswith(('+ ', '- ')):
+                values = added if x[0] == '+' else removed
+                x = x[2:]
+            values.append(x)
+        return (', '.join(removed) or None, ', '.join(added) or None)
+
+    @staticmethod
+    def _current(issue, field):
+        """Render an issue's current field value similar to journal values."""
+        try:
+            value = issue[field]
+        except KeyError:
+            return None
+        if isinstance(value, (list, tuple)):
+            return ', '.join(map(str, value)) or None
+        return str(value) if value is not None else None
+
+    @classmethod
+    def parse(cls, data, issues):
+        """Create events from issue journals and their current issue values.
+
+        Set events only journal the values fields had before being set, so
+        the new values are pulled from the next change to the same field or
+        from the issue's current value.
+        """
+        for journal, issue in zip(data, issues):
+            events = []
+            # values fields were set to, determined walking backwards in time
+            values = {}
+            for created, creator, action, args in reversed(journal):
+                # creation, link, and retire events don't alter issue fields
+                if action != 'set':
+                    continue
+                changes = {}
+                for field, value in args:
+                    if not value:
+                        continue
+                    if value.startswith(('+ ', '- ')):
+                        changes[field] = cls._multilink(value)
+                        continue
+                    # some templates render both the previous and current values
+                    old, sep, new = value.partition(' -> ')
+                    old = None if old == '(no value)' else old
+                    if sep:
+                        new = None if new == '(no value)' else new
+                    elif field in values:
+                        new = values[field]
+                    else:
+                        new = cls._current(issue, field)
+                    values[field] = old
+                    changes[field] = (old, new)
+                if changes:
+                    events.append((created, creator, changes))
+
+            yield tuple(
+                cls(count=i, creator=creator, created=created, changes=changes)
+                for i, (created, creator, changes) in enumerate(reversed(events), start=1))
+
+
 class RoundupCache(Cache):
+    """Cached ID to name mappings for Roundup classes.
+
+    Names are stored in arrays indexed by item ID with gaps for retired
+    items so mappings can be updated incrementally as items are added.
+    """
+
+    # cached classes mapped to the properties labeling their items
+    classes = {
+        'status': 'name',
+        'priority': 'name',
+        'keyword': 'name',
+        'user': 'username',
+    }
 
     def __init__(self, **kw):
         # default to empty values
-        defaults = {
-            'status': (),
-            'priority': (),
-            'keyword': (),
-            'users': (),
-        }
+        defaults = {k: () for k in self.classes}
+        super().__init__(defaults=defaults, **kw)
 
-        converters = {
-            'status': csv2tuple,
-            'priority': csv2tuple,
-            'keyword': csv2tuple,
-            'users': csv2tuple,
-        }
+    def name(self, cls, id):
+        """Return the name for a class item ID or None if it's unknown."""
+        index = int(id) - 1
+        if index < 0:
+            # item IDs start at 1
+            return None
+        try:
+            return self[cls][index]
+        except IndexError:
+            return None
 
-        super().__init__(defaults=defaults, converters=converters, **kw)
+    def ids(self, cls):
+        """Return the sorted IDs for all cached items of a class."""
+        return [i for i, x in enumerate(self[cls], 1) if x is not None]
 
 
 class Roundup(Xmlrpc):
@@ -185,40 +272,46 @@ class Roundup(Xmlrpc):
 
     @property
     def cache_updates(self):
-        """Pull latest data from service for cache update."""
-        config_updates = {}
-        values = {}
+        """Pull latest data from service for cache update.
+
+        Only classes with a changed item count or max ID are updated, pulling
+        the names for new item IDs and dropping retired ones.
+        """
+        updates = {}
 
         # login required to grab user data
         self.client.login(force=True)
 
-        attrs = ('status', 'priority', 'keyword', 'user')
+        # pull the current, unretired item IDs for all cached classes
+        classes = tuple(self.cache.classes.items())
+        data = self.multicall(
+            command='filter', params=([cls, None, {}] for cls, _label in classes)).send()
+
         reqs = []
-        # pull list of specified attribute types
-        names = list(self.multicall(command='list', params=attrs).send())
-
-        # The list command doesn't return the related values in the order that
-        # values their underlying IDs so we have to roll lookups across the
-        # entire scope to determine them.
-        for i, attr in enumerate(attrs):
-            data = names[i]
-            values[attr] = data
-            params = ([attr, x] for x in data)
-            reqs.append(self.multicall(command='lookup', params=params))
-
-        data = self.merged_multicall(reqs=reqs).send()
-        for attr in ('status', 'priority', 'keyword', 'user'):
-            order = next(data)
-            values[attr] = [x for order, x in sorted(zip(order, values[attr]))]
-
-        # don't sort, ordering is important for the mapping to work properly
-        config_updates['status'] = tuple(values['status'])
-        config_updates['priority'] = tuple(values['priority'])
-        config_updates['keyword'] = tuple(values['keyword'])
-        if 'user' in values:
-            config_updates['users'] = tuple(values['user'])
-
-        return config_updates
+        for (cls, label), ids in zip(classes, data):
+            ids = sorted(map(int, ids))
+            cached = self.cache.ids(cls)
+            if len(ids) == len(cached) and ids[-1:] == cached[-1:]:
+                continue
+
+            # item IDs aren't reused so known names are kept
+            names = [None] * (ids[-1] if ids else 0)
+            for i in ids:
+                names[i - 1] = self.cache.name(cls, i)
+            updates[cls] = names
+
+            new = [i for i in ids if names[i - 1] is None]
+            if new:
+                params = [[f'{cls}{i}', label] for i in new]
+                reqs.append((cls, label, new, self.multicall(command='display', params=params)))
+
+        if reqs:
+            data = self.merged_multicall(reqs=[x[-1] for x in reqs]).send()
+            for (cls, label, new, _req), values in zip(reqs, data):
+                for i, d in zip(new, values):
+                    updates[cls][i - 1] = d[label]
+
+        return updates
 
     def inject_auth(self, request, params):
         self.session.headers['Authorization'] = str(self.auth)
@@ -263,10 +356,9 @@ class _SearchRequest(ParseRequest, RPCRequest):
 
     def parse(self, data):
         # Roundup search requests return a list of matching IDs that we resubmit
-        # via a multicall to grab ticket data if any matches exist.
-        if data:
-            issues = self.service.GetItemRequest(ids=data, fields=self.fields).send()
-            yield from issues
+        # via concurrent, chunked multicalls to grab ticket data.
+        yield from self.service.pipeline(
+            data, lambda ids: self.service.GetItemRequest(ids=ids, fields=self.fields))
 
     def encode_params(self):
         params = self.params.copy()
@@ -308,12 +400,11 @@ class _SearchRequest(ParseRequest, RPCRequest):
             self.params.setdefault('sort', [('+', 'id')])
 
             # default to showing issues that aren't closed
-            # TODO: use service cache with status names here
             if 'status' not in self.params:
-                cached_statuses = self.service.cache['status']
-                if cached_statuses:
-                    open_statuses = list(
-                        i + 1 for i, x in enumerate(cached_statuses) if x != 'closed')
+                open_statuses = [
+                    i for i in self.service.cache.ids('status')
+                    if self.service.cache.name('status', i) != 'closed']
+                if open_statuses:
                     self.params['status'] = open_statuses
 
         def terms(self, k, v):
@@ -382,13 +473,24 @@ class _GetItemRequest(Multicall):
 
 
 @req_cmd(Roundup, cmd='get')
-class _GetRequest(_GetItemRequest):
+class _GetRequest(FollowupRequest, _GetItemRequest):
     """Construct a get request."""
 
-    def __init__(self, get_comments=True, get_attachments=True, **kw):
+    def __init__(self, get_comments=True, get_attachments=True, get_changes=False, **kw):
         super().__init__(**kw)
         self._get_comments = get_comments
         self._get_attachments = get_attachments
+        self._get_changes = get_changes
+        self._journals = None
+
+        # pull issue journals alongside the issues since their IDs are known
+        if self._get_changes:
+            self._reqs = (self.service._JournalRequest(ids=self.ids),)
+
+    def parse(self, data):
+        if self._get_changes:
+            data, self._journals = data
+        return super().parse(data)
 
     def handle_exception(self, e):
         if e.code == 'exceptions.IndexError':
@@ -399,10 +501,8 @@ class _GetRequest(_GetItemRequest):
             raise RoundupError(msg="field doesn't exist: {}".format(e.msg))
         raise
 
-    def parse(self, data):
-        issues = list(super().parse(data))
+    def followups(self, issues):
         reqs = []
-
         for issue in issues:
             if issue.files and self._get_attachments:
                 reqs.append(
@@ -416,16 +516,19 @@ class _GetRequest(_GetItemRequest):
             else:
                 reqs.append(NullRequest())
 
-        issue_data = self.service.merged_multicall(reqs=reqs).send()
-        # TODO: There doesn't appear to be a way to request issue changes via the API.
-        # changes = self.service.ChangesRequest(ids=self.ids).send()
+        return (self.service.merged_multicall(reqs=reqs),)
+
+    def combine(self, issues, data):
+        issue_data, = data
+        if self._get_changes:
+            changes = RoundupEvent.parse(self._journals, issues)
 
         for issue in issues:
             attachments = next(issue_data)
             comments = next(issue_data)
             issue.attachments = next(attachments)
             issue.comments = next(comments)
-            issue.changes = ()
+            issue.changes = next(changes) if self._get_changes else ()
             yield issue
 
 
@@ -514,6 +617,91 @@ class _CommentsRequest(BaseCommentsRequest, Multicall):
         yield from self.filter(items())
 
 
+class _JournalPageRequest(HTMLRequest):
+    """Construct a request scraping the history table from an issue's page."""
+
+    # history table rows, skipping the header rows
+    _rows = etree.XPath('//table[contains(@class, "history")]//tr[count(td) = 4]')
+
+    def __init__(self, *, service, id, **kw):
+        endpoint = f"{service.webbase.rstrip('/')}{service.item_endpoint.format(id=id)}"
+        super().__init__(
+            service=service, endpoint=endpoint, params={'@template': 'item'}, **kw)
+
+    @staticmethod
+    def _args(cell):
+        """Split a history args cell into its rendered fields and values."""
+        lines = [cell.text or '']
+        for el in cell:
+            if el.tag == 'br':
+                lines.append(el.tail or '')
+            else:
+                lines[-1] += el.text_content() + (el.tail or '')
+
+        args = []
+        for line in lines:
+            field, sep, value = ' '.join(line.split()).partition(':')
+            if sep:
+                args.append((field, value.strip()))
+        return tuple(args)
+
+    def parse_response(self, response):
+        doc = super().parse_response(response)
+        journal = []
+        for row in self._rows(doc):
+            date, user, action, args = row.findall('td')
+            created = datetime.strptime(
+                ' '.join(date.text_content().split())[:19], '%Y-%m-%d %H:%M:%S')
+            journal.append((
+                created.replace(tzinfo=utc), user.text_content().strip(),
+                action.text_content().strip(), self._args(args)))
+        # entries are rendered newest first
+        journal.reverse()
+        return tuple(journal)
+
+
+@req_cmd(Roundup, name='_JournalRequest')
+class _JournalRequest(Request):
+    """Construct a journal request.
+
+    Roundup's XML-RPC interface doesn't expose issue journals so they're
+    scraped concurrently from the history tables of the issues' web pages.
+    """
+
+    def __init__(self, ids=None, **kw):
+        super().__init__(**kw)
+        if ids is None:
+            raise ValueError(f'No {self.service.item.type} ID(s) specified')
+
+        self._reqs = tuple(_JournalPageRequest(service=self.service, id=i) for i in ids)
+        self.ids = ids
+
+
+@req_cmd(Roundup, cmd='changes')
+class _ChangesRequest(BaseChangesRequest):
+    """Construct a changes request.
+
+    The issues are requested alongside their journals to determine the
+    values fields were last set to.
+    """
+
+    def __init__(self, **kw):
+        super().__init__(**kw)
+
+        if not self.ids:
+            raise ValueError(f'No {self.service.item.type} ID(s) specified')
+        self.options.append(f"IDs: {', '.join(self.ids)}")
+
+        self._reqs = (
+            self.service._JournalRequest(ids=self.ids),
+            self.service.GetItemRequest(ids=self.ids),
+        )
+
+    def parse(self, data):
+        journals, issues = data
+        yield from self.filter(RoundupEvent.parse(journals, issues))
+
+
 @req_cmd(Roundup, cmd='schema')
 class _SchemaRequest(RPCRequest):
     """Construct a schema request."""
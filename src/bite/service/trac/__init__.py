@@ -31,6 +31,8 @@ class TracError(RequestError):
 
 class TracComment(Comment):
 
+    __slots__ = ()
+
     @classmethod
     def parse(cls, data):
         for changes in data:
@@ -54,6 +56,8 @@ class TracAttachment(Attachment):
 
 class TracEvent(Change):
 
+    __slots__ = ()
+
     _skip_fields = {'comment', 'attachment'}
 
     @classmethod
@@ -294,10 +298,9 @@ class _SearchRequest(BaseSearchRequest, RPCRequest):
 
     def parse(self, data):
         # Trac RPC search requests return a list of matching IDs that we resubmit
-        # via a multicall to grab ticket data if any matches exist.
-        if data:
-            tickets = self.service.GetItemRequest(ids=data).send()
-            yield from tickets
+        # via concurrent, chunked multicalls to grab ticket data.
+        yield from self.service.pipeline(
+            data, lambda ids: self.service.GetItemRequest(ids=ids))
 
 
 @req_cmd(Trac)
@@ -1,10 +1,8 @@
 """Support Trac's JSON-RPC interface."""
 
-from dateutil.parser import parse as dateparse
-
 from . import Trac
 from .._jsonrpc import Jsonrpc
-from ...utc import utc
+from ...utc import utc, parse_timestamp as dateparse
 
 
 def as_datetime(dct):
@@ -1,9 +1,10 @@
 """Web scraper for Trac without RPC support."""
 
-import lxml.html
 from urllib.parse import urlparse, parse_qs
 
-from dateutil.parser import parse as parsetime
+from lxml import etree
+import lxml.html
+from snakeoil import klass
 from snakeoil.klass import aliased, alias
 from snakeoil.strings import pluralism
 
@@ -12,13 +13,13 @@ from .. import Service
 from .._csv import CSVRequest
 from .._html import HTML
 from .._reqs import (
-    req_cmd, Request, NullRequest, URLRequest,
+    req_cmd, ExtractData, Request, NullRequest, URLRequest,
     BaseCommentsRequest, BaseChangesRequest,
 )
-from .._xml import XMLRequest
+from .._xml import XMLRequest, _IterContent
 from ...cache import Cache
 from ...exceptions import BiteError, ParsingError
-from ...utc import utc
+from ...utc import utc, parse_timestamp as parsetime
 
 
 class TracScraperCache(Cache):
@@ -56,53 +57,68 @@ class TracScraperTicket(TracTicket):
 class _TracScraperXMLItem(object):
     """RSS event feed items."""
 
-    def __init__(self, el):
-        self._el = el
-        self._namespaces = self._el.nsmap
+    _namespaces = {'dc': 'http://purl.org/dc/elements/1.1/'}
 
-    @property
-    def title(self):
-        return self._el.xpath('./title/text()')
+    # precompiled queries relative to feed items
+    _title = etree.XPath('string(./title)')
+    _dc_creator = etree.XPath('./dc:creator/text()', namespaces=_namespaces)
+    _author = etree.XPath('./author/text()')
+    _description = etree.XPath('string(./description)')
+    _pubdate = etree.XPath('string(./pubDate)')
+
+    def __init__(self, el):
+        # pull all data from the element so it can be freed while streaming
+        self.title = self._title(el) or None
+        creator = self._dc_creator(el) or self._author(el)
+        self.creator = creator[0] if creator else None
+        self.created = parsetime(self._pubdate(el))
+        self._desc_html = self._description(el)
+
+    @klass.jit_attr
+    def desc(self):
+        """Description HTML, parsed on first access."""
+        return lxml.html.fromstring(self._desc_html)
 
-    @property
-    def creator(self):
-        # extract comment creator
+    @classmethod
+    def iterparse(cls, response):
+        """Incrementally parse the items of an RSS feed response."""
+        items = etree.iterparse(_IterContent(response), events=('end',), tag='item')
         try:
-            creator = self._el.xpath('./dc:creator/text()', namespaces=self._namespaces)[0]
-        except IndexError:
-            try:
-                creator = self._el.xpath('./author/text()')[0]
-            except IndexError:
-                creator = None
-        return creator
+            for _event, el in items:
+                yield cls(el)
+                # free processed elements
+                el.clear()
+                while el.getprevious() is not None:
+                    del el.getparent()[0]
+        except etree.XMLSyntaxError as e:
+            raise ParsingError(msg='failed parsing RSS feed') from e
 
-    @property
-    def desc(self):
-        return lxml.html.fromstring(self._el.xpath('./description/text()')[0])
 
-    @property
-    def created(self):
-        return parsetime(self._el.xpath('./pubDate/text()')[0])
+class _TracScraperRSSRequest(XMLRequest):
+    """Construct a request streaming the items of a ticket's RSS feed."""
 
-    @classmethod
-    def parse(cls, tree):
-        for item in tree.xpath('//item'):
-            yield cls(item)
+    def parse_response(self, response):
+        return tuple(_TracScraperXMLItem.iterparse(response))
 
 
 class TracScraperRSSComment(TracComment):
 
+    __slots__ = ()
+
+    # comment paragraphs
+    _text = etree.XPath('descendant-or-self::p')
+
     @classmethod
     def parse(cls, data):
-        for id, tree in data:
+        for id, items in data:
             count = 1
             l = []
-            for item in _TracScraperXMLItem.parse(tree):
+            for item in items:
                 # skip attachment events
-                if item.title and item.title[0] == 'attachment set':
+                if item.title == 'attachment set':
                     continue
 
-                text = '\n'.join(x.text_content().strip() for x in item.desc.xpath('//p'))
+                text = '\n'.join(x.text_content().strip() for x in cls._text(item.desc))
                 # skip events without any comment
                 if not text:
                     continue
@@ -115,16 +131,19 @@ class TracScraperRSSComment(TracComment):
 
 class TracScraperRSSAttachment(TracAttachment):
 
+    # attachment filename
+    _filename = etree.XPath('descendant-or-self::em[1]')
+
     @classmethod
     def parse(cls, data):
-        for id, tree in data:
+        for id, items in data:
             l = []
-            for item in _TracScraperXMLItem.parse(tree):
+            for item in items:
                 # skip non-attachment events
-                if not item.title or item.title[0] != 'attachment set':
+                if item.title != 'attachment set':
                     continue
 
-                filename = item.desc.xpath('//em')[0].text_content()
+                filename = cls._filename(item.desc)[0].text_content()
                 l.append(cls(
                     creator=item.creator, created=item.created, filename=filename))
             yield tuple(l)
@@ -132,31 +151,35 @@ class TracScraperRSSAttachment(TracAttachment):
 
 class TracScraperRSSEvent(TracEvent):
 
+    __slots__ = ()
+
+    # change elements are found in the first unordered list inside the description
+    _changes = etree.XPath('(self::ul | .//ul[1])//li')
+    _field = etree.XPath('./strong/text()')
+    _updates = etree.XPath('./em/text()')
+    _action = etree.XPath('./text()')
+
     @classmethod
     def parse(cls, data):
-        for id, tree in data:
+        for id, items in data:
             l = []
             count = 1
-            for item in _TracScraperXMLItem.parse(tree):
+            for item in items:
                 # skip comments and attachment events
-                if not item.title or item.title[0] == 'attachment set':
+                if not item.title or item.title == 'attachment set':
                     continue
 
                 changes = {}
-
-                # change elements are found in the first unordered list inside
-                # the description
-                events = item.desc.xpath('//ul[1]//li')
-                for change in events:
-                    field = change.xpath('./strong/text()')[0]
-                    updates = change.xpath('./em/text()')
+                for change in cls._changes(item.desc):
+                    field = cls._field(change)[0]
+                    updates = cls._updates(change)
                     if updates:
                         removed = added = None
                         if len(updates) == 2:
                             removed, added = updates
                         elif len(updates) == 1:
-                            li_text = ''.join(change.xpath('./text()')).strip()
-                            value = change.xpath('./em/text()')[0]
+                            li_text = ''.join(cls._action(change)).strip()
+                            value = updates[0]
                             if li_text in ('deleted', 'removed'):
                                 removed = value
                             elif li_text in ('set to', 'added'):
@@ -297,14 +320,59 @@ class _SearchRequest(BaseSearchRequest, URLRequest):
             self.options.append(f"{self.service.item.attributes[k]}: {', '.join(v)}")
 
 
+class _CSVPageResults(ExtractData):
+    """Treat pages past the end of the query results as empty."""
+
+    def handle_exception(self, e):
+        if e.text and 'beyond the number of pages' in e.text:
+            return ()
+        raise e
+
+
 @req_cmd(TracScraperCSV, name='SearchRequest', cmd='search')
 class _SearchRequestCSV(CSVRequest, _SearchRequest):
-    """Construct a search request pulling the CSV format."""
+    """Construct a search request pulling the CSV format.
+
+    If a max results size is set, the query is pulled in pages of that size
+    with multiple pages being requested concurrently.
+    """
+
+    # number of pages to request concurrently
+    _concurrent_pages = 4
 
     def __init__(self, **kw):
         super().__init__(**kw)
         self.params['format'] = 'csv'
 
+    def _page_request(self, page):
+        """Create a request for a given page of results."""
+        params = self.params.copy()
+        params['page'] = page
+        req = self._copy(params)
+        req._iterate = _CSVPageResults
+        return req
+
+    def send(self):
+        size = self.params.get('max')
+        if not size:
+            yield from super().send()
+            return
+
+        # request the first page alone since small queries often fit within it
+        page, window = 1, 1
+        while True:
+            reqs = [self._page_request(page + i) for i in range(window)]
+            for data in self.service.send(reqs):
+                count = 0
+                for item in data:
+                    count += 1
+                    yield item
+                # a partial page signals the end of the results
+                if count < size:
+                    return
+            page += window
+            window = self._concurrent_pages
+
     def parse(self, data):
         for item in data:
             yield self.service.item(get_desc=self._get_desc, **item)
@@ -339,7 +407,7 @@ class _ChangelogRequest(Request):
         if data is None:
             reqs = []
             for i in ids:
-                reqs.append(XMLRequest(
+                reqs.append(_TracScraperRSSRequest(
                     service=self.service, endpoint=f'/ticket/{i}?format=rss'))
         else:
             reqs = [NullRequest()]
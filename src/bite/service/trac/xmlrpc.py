@@ -1,10 +1,8 @@
 """Support Trac's XML-RPC interface."""
 
-from dateutil.parser import parse as dateparse
-
 from . import Trac
 from .._xmlrpc import Xmlrpc, MulticallIterator, _Unmarshaller
-from ...utc import utc
+from ...utc import utc, parse_timestamp as dateparse
 
 
 class _Unmarshaller_UTC(_Unmarshaller):
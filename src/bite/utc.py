@@ -1,4 +1,5 @@
-from datetime import tzinfo, timedelta, datetime
+from datetime import tzinfo, timedelta, timezone, datetime
+from functools import lru_cache
 import re
 
 from dateutil.parser import parse as parsetime
@@ -69,6 +70,39 @@ def utcnow():
     return d.replace(microsecond=0)
 
 
+# ISO 8601 timestamps as returned by the various services, e.g. 2017-01-01T00:00:00Z,
+# 20170101T00:00:00, 2017-01-01 00:00:00.123456, or 2017-01-01T00:00:00.000+0000
+_timestamp_re = re.compile(
+    r'^(\d{4})-?(\d\d)-?(\d\d)[T ](\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?'
+    r'(?:(Z)|([+-])(\d\d):?(\d\d))?$')
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(s):
+    """Parse a timestamp string returned by a service into a datetime object.
+
+    The fixed ISO 8601 formats used by most services are decoded directly,
+    anything else falls back to dateutil's much slower generic parser.
+    Results are cached since the same timestamps often recur in bulk data,
+    e.g. a bug's creation time and its initial comment.
+    """
+    m = _timestamp_re.match(s)
+    if m is None:
+        return parsetime(s)
+
+    year, month, day, hour, minute, second, frac, zulu, sign, tz_hour, tz_minute = m.groups()
+    tz = None
+    if zulu is not None:
+        tz = utc
+    elif sign is not None:
+        offset = timedelta(hours=int(tz_hour), minutes=int(tz_minute))
+        tz = timezone(-offset if sign == '-' else offset) if offset else utc
+    microsecond = int(frac.ljust(6, '0')) if frac else 0
+    return datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second),
+        microsecond, tzinfo=tz)
+
+
 def parse_date(s):
     if re.match(r'^(\d+([ymwdhs]|min))+$', s):
         date = utcnow()
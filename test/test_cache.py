@@ -0,0 +1,254 @@
+import os
+import threading
+import time
+
+import pytest
+from pytest import raises
+
+from bite import const
+from bite.cache import Cache, Index, RateLimit, _finish_refreshes, _write_all
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(const, 'USER_CACHE_PATH', str(tmp_path))
+    return tmp_path
+
+
+class _TtlCache(Cache):
+    ttl = 60
+
+
+def test_write(cache_path):
+    cache = Cache(connection='test', defaults={'foo': 1, 'bar': ()})
+    assert cache['foo'] == 1
+    assert cache.get('missing') is None
+    with raises(KeyError):
+        cache['missing']
+
+    cache.write({'foo': 2, 'bar': ['a', 'b']})
+    assert cache['foo'] == 2
+    assert os.path.exists(cache_path / 'metadata' / 'test.db')
+
+    # values are loaded from the store by new instances with lists as tuples
+    cache = Cache(connection='test', defaults={'foo': 1, 'bar': ()})
+    assert cache['foo'] == 2
+    assert cache['bar'] == ('a', 'b')
+
+    cache.remove()
+    assert not os.path.exists(cache_path / 'metadata' / 'test.db')
+    assert Cache(connection='test', defaults={'foo': 1})['foo'] == 1
+
+
+def test_no_connection(cache_path):
+    cache = Cache(connection=None, defaults={'foo': 1})
+    cache.write({'foo': 2})
+    assert cache['foo'] == 2
+    cache.remove()
+    assert not os.listdir(cache_path)
+
+
+def test_remove_legacy(cache_path):
+    os.makedirs(cache_path / 'config')
+    (cache_path / 'config' / 'test').write_text('old')
+    Cache(connection='test')
+    assert not os.path.exists(cache_path / 'config' / 'test')
+
+
+def test_refresh():
+    refreshed = threading.Event()
+    finish = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        finish.wait()
+        cache.write({'foo': 2})
+
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=refresh)
+    # missing values trigger a background refresh while the default is returned
+    assert cache['foo'] == 1
+    assert refreshed.wait(5)
+    finish.set()
+    cache._refreshing.join(5)
+    assert cache['foo'] == 2
+
+    # fresh values don't trigger refreshes
+    refreshed.clear()
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=refresh)
+    assert cache['foo'] == 2
+    assert cache._refreshing is None
+
+
+def test_refresh_stale(monkeypatch):
+    calls = []
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=lambda: calls.append(1))
+    cache.write({'foo': 2})
+
+    # outdated values are returned while being refreshed
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + cache.ttl + 1)
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=lambda: calls.append(1))
+    assert cache['foo'] == 2
+    cache._refreshing.join(5)
+    assert calls == [1]
+
+
+def test_refresh_attempt():
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        raise Exception('failed')
+
+    # failed refreshes are logged and recorded
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=refresh)
+    assert cache['foo'] == 1
+    cache._refreshing.join(5)
+    assert calls == [1]
+
+    # and aren't retried until the retry interval has passed
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=refresh)
+    assert cache['foo'] == 1
+    assert cache._refreshing is None
+
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=refresh)
+    cache.retry = 0
+    time.sleep(0.01)
+    assert cache['foo'] == 1
+    cache._refreshing.join(5)
+    assert calls == [1, 1]
+
+
+def test_refresh_exit():
+    finish = threading.Event()
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=finish.wait)
+    cache.exit_timeout = 0.01
+    assert cache['foo'] == 1
+
+    # refreshes that don't finish in time at exit are recorded
+    _finish_refreshes()
+    assert cache._refreshing.is_alive()
+    finish.set()
+    cache = _TtlCache(connection='test', defaults={'foo': 1}, refresh=finish.wait)
+    assert cache['foo'] == 1
+    assert cache._refreshing is None
+
+    # while finished ones aren't
+    cache = _TtlCache(connection='other', defaults={'foo': 1}, refresh=lambda: None)
+    assert cache['foo'] == 1
+    _finish_refreshes()
+    assert not cache._refreshing.is_alive()
+    cache = _TtlCache(connection='other', defaults={'foo': 1}, refresh=lambda: None)
+    assert cache['foo'] == 1
+    assert cache._refreshing is not None
+
+
+def test_ratelimit_update():
+    ratelimit = RateLimit('test')
+    reset = int(time.time()) + 3600
+    headers = {'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '50',
+               'X-RateLimit-Reset': str(reset), 'X-RateLimit-Resource': 'search'}
+    assert not ratelimit.update('/search', headers)
+    assert ratelimit._budgets['search'] == [100, 50, reset]
+    assert ratelimit._routes['/search'] == 'search'
+
+    # older counts for the same window are ignored
+    assert not ratelimit.update('/search', dict(headers, **{'X-RateLimit-Remaining': '60'}))
+    assert ratelimit._budgets['search'] == [100, 50, reset]
+
+    # exhausted budgets are reported
+    assert ratelimit.update('/search', dict(headers, **{'X-RateLimit-Remaining': '0'}))
+
+    # relative resets and unprefixed headers
+    headers = {'RateLimit-Limit': '10', 'RateLimit-Remaining': '5', 'RateLimit-Reset': '60'}
+    assert not ratelimit.update('/', headers)
+    limit, remaining, reset = ratelimit._budgets['default']
+    assert (limit, remaining) == (10, 5)
+    assert 0 < reset - time.time() <= 60
+
+
+def test_ratelimit_write():
+    ratelimit = RateLimit('test')
+    reset = int(time.time()) + 3600
+    headers = {'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '50',
+               'X-RateLimit-Reset': str(reset)}
+    ratelimit.update('/', headers)
+
+    # budgets are only saved on exit until nearly exhausted
+    assert RateLimit('test')._budgets == {}
+    ratelimit.update('/', dict(headers, **{'X-RateLimit-Remaining': '10'}))
+    assert RateLimit('test')._budgets == {'default': [100, 10, reset]}
+
+    ratelimit.update('/', dict(headers, **{'X-RateLimit-Remaining': '5'}))
+    ratelimit.write()
+    assert RateLimit('test')._budgets == {'default': [100, 5, reset]}
+
+
+def test_ratelimit_exit():
+    reset = int(time.time()) + 3600
+    headers = {'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '50',
+               'X-RateLimit-Reset': str(reset)}
+    ratelimits = [RateLimit(x) for x in ('a', 'b')]
+    for x in ratelimits:
+        x.update('/', headers)
+
+    # budgets of all connections are saved at exit
+    _write_all()
+    for x in ('a', 'b'):
+        assert RateLimit(x)._budgets == {'default': [100, 50, reset]}
+
+
+def test_ratelimit_acquire(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, 'sleep', sleeps.append)
+    reset = int(time.time()) + 100
+    headers = {'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '51',
+               'X-RateLimit-Reset': str(reset)}
+
+    # interactive requests aren't delayed while budget remains
+    ratelimit = RateLimit(None)
+    ratelimit.update('/', headers)
+    ratelimit.acquire('/')
+    assert sleeps == []
+    assert ratelimit._budgets['default'][1] == 50
+
+    # bulk requests are spread out over the remaining window
+    ratelimit = RateLimit(None, bulk=True)
+    ratelimit.update('/', headers)
+    ratelimit.acquire('/')
+    ratelimit.acquire('/')
+    assert len(sleeps) == 1
+    assert 1 < sleeps[0] <= 2.5
+
+    # exhausted budgets wait until reset
+    sleeps.clear()
+    ratelimit = RateLimit(None)
+    ratelimit.update('/', dict(headers, **{'X-RateLimit-Remaining': '0'}))
+    ratelimit.acquire('/')
+    assert len(sleeps) == 1
+    assert 90 < sleeps[0] <= 100
+
+
+def test_index(cache_path):
+    index = Index('test', 'aliases')
+    assert index.lookup([1]) is None
+    index.update([(1, 'foo'), (2, 'bar')])
+    assert index.lookup([1, 2]) == ['foo', 'bar']
+    assert 1 in index and '2' in index
+    assert index.get(3) is None
+
+    # mappings are only saved at exit
+    assert len(Index('test', 'aliases')) == 0
+    index.write()
+    assert len(Index('test', 'aliases')) == 2
+
+    # mappings added by other runs are merged
+    other = Index('test', 'aliases')
+    other.update([(3, 'baz')])
+    index.update([(4, 'qux')])
+    _write_all()
+    assert len(Index('test', 'aliases')) == 4
+
+    # corrupted files are ignored
+    (cache_path / 'index' / 'aliases' / 'test').write_text('{')
+    assert len(Index('test', 'aliases')) == 0
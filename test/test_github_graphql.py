@@ -0,0 +1,129 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from pytest import raises
+
+from bite.exceptions import BiteError
+from bite.service.github import GithubError, GithubGraphql
+
+
+def _issue(number, comments=1):
+    return {
+        'id': f'I_{number}', 'number': number, 'title': f'issue {number}',
+        'state': 'OPEN', 'body': 'body', 'url': f'https://example.com/{number}',
+        'createdAt': '2020-01-01T00:00:00Z', 'updatedAt': '2020-01-02T00:00:00Z',
+        'closedAt': None, 'author': {'login': 'user'},
+        'assignees': {'nodes': []}, 'labels': {'nodes': [{'name': 'bug'}]},
+        'milestone': None,
+        'comments': {
+            'pageInfo': {'hasNextPage': comments > 1, 'endCursor': 'c1'},
+            'nodes': [_comment(1)],
+        },
+    }
+
+
+def _comment(id):
+    return {
+        'databaseId': id, 'author': {'login': 'user'}, 'body': f'comment {id}',
+        'createdAt': '2020-01-01T00:00:00Z', 'updatedAt': '2020-01-01T00:00:00Z',
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Stand-in GraphQL server resolving the queries bite sends."""
+
+    # issue numbers that exist
+    issues = {1: 1, 2: 2, 3: 1}
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        query, variables = request['query'], request.get('variables', {})
+
+        if 'search(' in query:
+            # two pages of search results
+            cursor = variables.get('cursor')
+            number = 3 if cursor else 1
+            data = {'search': {
+                'issueCount': 2,
+                'pageInfo': {'hasNextPage': cursor is None, 'endCursor': 'p1'},
+                'nodes': [_issue(number)],
+            }}
+            response = {'data': data}
+        elif 'node(' in query:
+            # remaining comment pages for an issue
+            last = variables['cursor'] == 'c2'
+            data = {'node': {'comments': {
+                'pageInfo': {'hasNextPage': not last, 'endCursor': 'c2'},
+                'nodes': [_comment(3 if last else 2)],
+            }}}
+            response = {'data': data}
+        else:
+            repo, errors = {}, []
+            for alias, number in re.findall(r'(i\d+): issue\(number: (\d+)\)', query):
+                number = int(number)
+                if number in self.issues:
+                    repo[alias] = _issue(number, self.issues[number])
+                else:
+                    repo[alias] = None
+                    errors.append({
+                        'path': ['repository', alias],
+                        'message': f'Could not resolve to an Issue with the number of {number}.',
+                    })
+            response = {'data': {'repository': repo}}
+            if errors:
+                response['errors'] = errors
+
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def service():
+    server = HTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    try:
+        yield GithubGraphql(base=f'http://127.0.0.1:{server.server_port}/org/repo')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_get(service):
+    issues = list(service.GetRequest(ids=[1, 2]).send())
+    assert [x.id for x in issues] == [1, 2]
+    # remaining comment pages are requested, the body is the initial comment
+    assert [c.text for c in issues[0].comments] == ['body', 'comment 1']
+    assert [c.text for c in issues[1].comments] == [
+        'body', 'comment 1', 'comment 2', 'comment 3']
+
+
+def test_get_missing(service):
+    # lookup errors are reported for the related issues only
+    with raises(GithubError) as excinfo:
+        list(service.GetRequest(ids=[1, 4, 2, 5]).send())
+    msg = str(excinfo.value)
+    assert '#4: Could not resolve' in msg
+    assert '#5: Could not resolve' in msg
+    assert '#1' not in msg and '#2' not in msg
+
+
+def test_search(service):
+    issues = list(service.SearchRequest(terms=['issue']).send())
+    assert [x.id for x in issues] == [1, 3]
+
+
+def test_search_offset(service):
+    with raises(BiteError):
+        service.SearchRequest(terms=['issue'], offset=10)
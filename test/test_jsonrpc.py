@@ -0,0 +1,139 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from pytest import raises
+
+from bite import const
+from bite.exceptions import RequestError
+from bite.service.bugzilla import BugzillaError
+from bite.service.bugzilla.jsonrpc import BugzillaJsonrpc
+
+
+def _comment(id):
+    return {
+        'id': 1, 'bug_id': id, 'text': f'comment {id}', 'creator': 'user',
+        'creation_time': '2017-01-01T00:00:00Z', 'count': 0,
+        'attachment_id': None, 'is_private': False,
+    }
+
+
+def _result(call):
+    method, params = call['method'], call['params'][0] if call['params'] else {}
+    if method == 'Bug.fields':
+        return {'fields': [{'values': [
+            {'name': 'NEW', 'is_open': True}, {'name': 'FIXED', 'is_open': False}]}]}
+    elif method == 'Product.get':
+        return {'products': [{'id': 1, 'name': 'product', 'is_active': True}]}
+    elif method == 'Product.get_accessible_products':
+        return {'ids': [1]}
+    elif method == 'Bugzilla.version':
+        return {'version': '5.0'}
+    elif method == 'Bug.get':
+        return {'bugs': [{'id': i, 'summary': f'bug {i}'} for i in params['ids']], 'faults': []}
+    elif method == 'Bug.comments':
+        return {'bugs': {str(i): {'comments': [_comment(i)]} for i in params['ids']}}
+    elif method == 'Bug.attachments':
+        return {'bugs': {str(i): [] for i in params['ids']}}
+    raise ValueError(f'unknown method: {method}')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Stand-in Bugzilla JSON-RPC server."""
+
+    # error object returned for batch requests, batches are supported if None
+    batch_error = None
+    # batch request IDs left out of the results
+    missing = ()
+    # received requests, batches are recorded as lists of methods
+    received = []
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if isinstance(data, list):
+            self.received.append([x['method'] for x in data])
+            if self.batch_error is not None:
+                response = {'id': None, 'result': None, 'error': self.batch_error}
+            else:
+                response = [
+                    {'id': x['id'], 'result': _result(x), 'error': None}
+                    for x in data if x['id'] not in self.missing]
+        else:
+            self.received.append(data['method'])
+            response = {'id': data['id'], 'result': _result(data), 'error': None}
+
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(const, 'USER_CACHE_PATH', str(tmp_path))
+    monkeypatch.setattr(_Handler, 'received', [])
+    server = HTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _service(server):
+    service = BugzillaJsonrpc(base=f'http://127.0.0.1:{server.server_port}/')
+    _Handler.received.clear()
+    return service
+
+
+def test_batch(server):
+    service = _service(server)
+    bugs = list(service.get(ids=[1, 2]))
+    assert [(x.id, [c.text for c in x.comments]) for x in bugs] == [
+        (1, ['comment 1']), (2, ['comment 2'])]
+    # bug data, comments and attachments are requested in a single batch
+    assert _Handler.received == [['Bug.get', 'Bug.comments', 'Bug.attachments']]
+    assert service._batch_requests
+
+
+def test_batch_fallback(server, monkeypatch):
+    monkeypatch.setattr(_Handler, 'batch_error', {'code': -32600, 'message': 'invalid request'})
+    service = _service(server)
+    bugs = list(service.get(ids=[1, 2]))
+    assert [(x.id, [c.text for c in x.comments]) for x in bugs] == [
+        (1, ['comment 1']), (2, ['comment 2'])]
+    # rejected batches are resent as separate requests
+    assert _Handler.received[0] == ['Bug.get', 'Bug.comments', 'Bug.attachments']
+    assert sorted(_Handler.received[1:]) == ['Bug.attachments', 'Bug.comments', 'Bug.get']
+    assert not service._batch_requests
+
+    # later batches are sent separately without retrying
+    _Handler.received.clear()
+    list(service.get(ids=[1]))
+    assert sorted(_Handler.received) == ['Bug.attachments', 'Bug.comments', 'Bug.get']
+
+
+def test_batch_error(server, monkeypatch):
+    monkeypatch.setattr(_Handler, 'batch_error', {'code': 32000, 'message': 'server error'})
+    service = _service(server)
+    # other errors aren't treated as rejected batches
+    with raises(BugzillaError, match='server error'):
+        list(service.get(ids=[1]))
+    assert len(_Handler.received) == 1
+    assert service._batch_requests
+
+
+def test_batch_missing(server, monkeypatch):
+    monkeypatch.setattr(_Handler, 'missing', (1,))
+    service = _service(server)
+    with raises(RequestError, match='missing batch result for request ID: 1'):
+        list(service.get(ids=[1]))
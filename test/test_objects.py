@@ -0,0 +1,94 @@
+import bz2
+from datetime import datetime
+import gzip
+import lzma
+
+from pytest import raises
+
+from bite.objects import Change, Comment, decompress, field_change, peek
+from bite.service.bugzilla.objects import BugzillaComment, BugzillaEvent
+
+
+def test_slots():
+    # events don't allocate per instance attribute dicts
+    for cls in (Change, Comment, BugzillaComment, BugzillaEvent):
+        assert '__dict__' not in dir(cls)
+    comment = Comment(creator='user', created=datetime(2017, 1, 1), text='text')
+    with raises(AttributeError):
+        comment.foo = 'bar'
+
+
+def test_no_changes():
+    # events without changes share the same immutable mapping
+    a = Change(creator='user', created=datetime(2017, 1, 1), changes=None)
+    b = Comment(creator='user', created=datetime(2017, 1, 1), changes={})
+    assert not a.changes
+    assert a.changes is b.changes
+    with raises(TypeError):
+        a.changes['foo'] = 'bar'
+
+
+def test_field_change():
+    field, change = field_change(''.join(['bug_', 'status']), 'NEW', 'FIXED')
+    assert field == 'bug_status'
+    assert field is field_change('bug_status', None, None)[0]
+    assert change == ('NEW', 'FIXED')
+
+    change = {
+        'who': 'user', 'when': '2017-01-01T00:00:00Z',
+        'changes': [
+            {'field_name': 'bug_status', 'removed': 'NEW', 'added': 'RESOLVED'},
+            {'field_name': 'target_milestone', 'removed': '---', 'added': '1.0'},
+        ],
+    }
+    events = [BugzillaEvent(change, id=1, count=i) for i in range(2)]
+    assert events[0].changes == {
+        'bug_status': ('NEW', 'RESOLVED'), 'target_milestone': (None, '1.0')}
+    # field names are shared across events
+    keys = [list(x.changes) for x in events]
+    assert all(a is b for a, b in zip(*keys))
+    assert events[0].match(['bug_status:+RESOLVED'])
+
+
+class _Data(object):
+
+    def __init__(self, data):
+        self.data = data
+
+    @decompress
+    def read(self):
+        return self.data
+
+
+def test_decompress():
+    data = b'data ' * 100
+    for compress in (bz2.compress, gzip.compress, lzma.compress):
+        assert _Data(compress(data)).read() == data
+        assert _Data(compress(data)).read(raw=True) == compress(data)
+
+    # nested formats are all decompressed
+    assert _Data(gzip.compress(bz2.compress(data))).read() == data
+
+    # uncompressed data is returned as is
+    assert _Data(data).read() == data
+
+
+def test_decompress_multistream():
+    # concatenated streams are decompressed entirely
+    for compress in (bz2.compress, gzip.compress, lzma.compress):
+        assert _Data(compress(b'foo') + compress(b'bar')).read() == b'foobar'
+
+
+def test_decompress_false_signature():
+    # data starting with a compression signature is returned as is
+    for data in (b'BZh not bzip2', b'\x1f\x8b not gzip', b'\xfd7zXZ\x00 not xz'):
+        assert _Data(data).read() == data
+
+
+def test_peek():
+    data = b'#!/bin/sh\n' + b'echo data\n' * 10000
+    assert peek(data, size=10) == b'#!/bin/sh\n'
+    for compress in (bz2.compress, gzip.compress, lzma.compress):
+        assert peek(compress(data), size=10) == b'#!/bin/sh\n'
+    assert peek(bz2.compress(gzip.compress(data)), size=10) == b'#!/bin/sh\n'
+    assert peek(b'BZh not bzip2', size=3) == b'BZh'
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from bite.service._scheduler import Scheduler
+
+
+def test_host_limit():
+    scheduler = Scheduler(max_workers=8)
+    executor = scheduler.executor('host', max_workers=2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def task():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+
+    futures = [executor.submit(task) for _ in range(10)]
+    scheduler.join()
+    assert all(f.done() for f in futures)
+    assert max(peak) == 2
+
+
+def test_fairness():
+    scheduler = Scheduler(max_workers=1)
+    order = []
+    start = threading.Event()
+
+    # block the only worker while tasks for both hosts are queued
+    scheduler.submit('a', 1, start.wait)
+    for host in ('a', 'a', 'a', 'b', 'b', 'b'):
+        scheduler.submit(host, 1, order.append, host)
+    start.set()
+    scheduler.join()
+    # hosts are alternated instead of running in submission order
+    assert order == ['b', 'a', 'b', 'a', 'b', 'a']
+
+
+def test_results():
+    scheduler = Scheduler(max_workers=2)
+    executor = scheduler.executor('host')
+    assert executor.submit(sum, (1, 2)).result(5) == 3
+
+    def fail():
+        raise ValueError('failed')
+
+    future = executor.submit(fail)
+    assert isinstance(future.exception(5), ValueError)
+
+
+def test_nested():
+    # tasks waiting on their subtasks can't exhaust the pool
+    scheduler = Scheduler(max_workers=2)
+    executor = scheduler.executor('host', max_workers=2)
+
+    def task(depth):
+        if not depth:
+            return 1
+        futures = [executor.submit(task, depth - 1) for _ in range(2)]
+        return sum(f.result() for f in futures)
+
+    assert executor.submit(task, 4).result(10) == 16
+    scheduler.join()
+
+
+def test_cancel():
+    scheduler = Scheduler(max_workers=1)
+    started = threading.Event()
+    start = threading.Event()
+
+    def task():
+        started.set()
+        return start.wait(5)
+
+    running = scheduler.submit('host', 1, task)
+    assert started.wait(5)
+    queued = [scheduler.submit('host', 1, time.sleep, 0) for _ in range(3)]
+
+    # queued tasks are cancelled while running ones finish
+    scheduler.cancel()
+    assert all(f.cancelled() for f in queued)
+    start.set()
+    assert running.result(5)
+    scheduler.join()
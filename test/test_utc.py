@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+
+from bite.utc import parse_timestamp, utc
+
+
+def test_parse_timestamp():
+    expected = datetime(2017, 1, 2, 3, 4, 5, tzinfo=utc)
+    for s in ('2017-01-02T03:04:05Z', '2017-01-02 03:04:05Z',
+              '20170102T03:04:05Z', '2017-01-02T03:04:05+0000',
+              '2017-01-02T03:04:05.000+0000', '2017-01-02T03:04:05+00:00'):
+        assert parse_timestamp(s) == expected
+        assert parse_timestamp(s).tzinfo is utc
+
+    # timestamps lacking timezones are naive
+    assert parse_timestamp('2017-01-02T03:04:05') == datetime(2017, 1, 2, 3, 4, 5)
+
+    # fractional seconds
+    assert parse_timestamp('2017-01-02 03:04:05.123456').microsecond == 123456
+    assert parse_timestamp('2017-01-02 03:04:05.12').microsecond == 120000
+    assert parse_timestamp('2017-01-02 03:04:05.1234567').microsecond == 123456
+
+    # timezone offsets
+    dt = parse_timestamp('2017-01-02T03:04:05.000-0530')
+    assert dt.utcoffset() == -timedelta(hours=5, minutes=30)
+    assert dt.astimezone(utc) == datetime(2017, 1, 2, 8, 34, 5, tzinfo=utc)
+    assert parse_timestamp('2017-01-02T03:04:05+02:00').tzinfo == timezone(timedelta(hours=2))
+
+
+def test_parse_timestamp_fallback():
+    # other formats fall back to the generic parser
+    assert parse_timestamp('Jan 2 2017 03:04:05') == datetime(2017, 1, 2, 3, 4, 5)